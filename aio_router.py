@@ -0,0 +1,218 @@
+import asyncio
+import signal
+import socket
+import threading
+
+from framing import next_frame, stream_reader
+from log import log
+from router import (Router, HELLO_INTERVAL, UPDATE_INTERVAL, UDP_RCVBUF,
+                    CONNECT_RETRY_MIN, CONNECT_RETRY_MAX, HANDSHAKE_TIMEOUT)
+
+# Enallaktiko runtime: idio protocol me ton Router, alla ena asyncio event loop
+# anti gia ena thread ana TCP syndesh, ana timer kai ana triggered update.
+# Diko tou thread kratane mono to FIB, giati oi kernel klhseis mplokaroun.
+
+
+class StreamConn:
+    # Prosarmogh tou StreamWriter sto interface socket (sendall/close)
+    # pou xrhsimopoioun ta send_hellos kai remove_neighbor
+    def __init__(self, writer):
+        self.writer = writer
+
+    def sendall(self, data):
+        if self.writer.is_closing():
+            raise ConnectionError("connection closed")
+        self.writer.write(data)
+
+    def close(self):
+        self.writer.close()
+
+
+class DVProtocol(asyncio.DatagramProtocol):
+    def __init__(self, router):
+        self.router = router
+
+    def datagram_received(self, data, addr):
+        try:
+            self.router.handle_datagram(data)
+        except Exception as e:
+            self.router.rx_errors.inc()
+            log.error('UDP', "UDP Error: {error}", error=e)
+
+
+class AsyncRouter(Router):
+    main_task = None
+    loop = None
+
+    async def read_frame(self, reader, frames, pending):
+        # Opws to framing.read_frame, me await sto read
+        frame = next_frame(frames, pending)
+        while frame is None:
+            data = await reader.read(4096)
+            if not data:
+                return None
+            frame = next_frame(frames, pending, data)
+        return frame
+
+    async def read_handshake(self, reader):
+        # Opws to framing.read_handshake, me await sto read
+        data = await reader.read(4096)
+        if not data:
+            return None, None, None
+        frames, pending = stream_reader(data)
+        return await self.read_frame(reader, frames, pending), frames, pending
+
+    async def handle_stream(self, reader, writer, initiated):
+        # Opws to Router.handle_connection, me await sta reads
+        neighbor_name = None
+        error = None
+        conn = StreamConn(writer)
+        ip = writer.get_extra_info('peername')[0]
+        try:
+            if initiated:
+                conn.sendall(self.conn_params())
+            data, frames, pending = await asyncio.wait_for(self.read_handshake(reader), HANDSHAKE_TIMEOUT)
+            if data is None: return
+            neighbor_name = self.open_session(data, conn, ip, frames, initiated)
+
+            # Loop pou akouei gia Hello messages (ena read mporei na fernei polla)
+            while True:
+                for frame in pending:
+                    self.handle_frame(neighbor_name, frame)
+                data = await reader.read(4096)
+                if not data: break
+                pending = frames.feed(data)
+        except Exception as e:
+            error = e
+        finally:
+            self.close_session(neighbor_name, conn, ip, initiated, error)
+
+    async def accept_stream(self, reader, writer):
+        await self.handle_stream(reader, writer, False)
+
+    async def connect_all(self):
+        # Prospathoume na syndethoume energitika stous geitones pou dothikan sthn eisodo
+        # (to UDP socket akouei hdh), me backoff oso o geitonas den akouei akoma
+        for nip, nport in self.neighbors:
+            self.start_connect(nip, nport)
+
+    def spawn_connect(self, nip, nport, wait):
+        # Task sto loop anti gia thread
+        asyncio.create_task(self.connect_one(nip, nport, wait))
+
+    async def connect_one(self, nip, nport, wait=0):
+        delay = CONNECT_RETRY_MIN
+        await asyncio.sleep(wait)
+        try:
+            while not self.neighbor_connected(nip):
+                try:
+                    reader, writer = await asyncio.open_connection(nip, int(nport))
+                    asyncio.create_task(self.handle_stream(reader, writer, True))
+                    return
+                except OSError:
+                    if delay == CONNECT_RETRY_MIN:
+                        log.warn('Fail', "Connect to {ip}, retrying", ip=nip)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, CONNECT_RETRY_MAX)
+        finally:
+            with self.neighbor_lock:
+                self.connecting.discard(nip)
+
+    async def periodic_loop(self):
+        log.info('System', "Periodic DV Sender started ({interval}s)", interval=UPDATE_INTERVAL)
+        while True:
+            await asyncio.sleep(UPDATE_INTERVAL)
+            self.send_dv_updates(triggered=False)
+            log.debug('Periodic', "Sent routing table update.")
+
+    async def hello_loop(self):
+        while True:
+            await asyncio.sleep(HELLO_INTERVAL)
+            self.send_hellos()
+
+    async def expiry_loop(self):
+        log.info('System', "Garbage Collector started")
+        counter = 0
+        while True:
+            await asyncio.sleep(1)
+            counter += 1
+            self.housekeeping(counter)
+
+    async def scheduler_loop(self):
+        # To flush twn triggered updates trexei sto loop: perimenoume na ginei
+        # dirty to table kai meta to deadline tou hold-down parathyrou
+        while True:
+            self.update_event.clear()
+            deadline = self.scheduler.next_deadline()
+            if deadline is None:
+                await self.update_event.wait()
+                continue
+            delay = deadline - self.clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.scheduler.poll(self.clock()):
+                self.send_dv_updates(triggered=True)
+
+    def read_batch(self, loop, conn):
+        fd = conn.fileno()
+        data = self.ingest.receive(conn)
+        if data is None:
+            loop.remove_reader(fd)
+            return
+        try:
+            self.handle_batch(data)
+        except Exception as e:
+            self.rx_errors.inc()
+            log.error('UDP', "UDP Error: {error}", error=e)
+
+    async def main(self):
+        loop = self.loop = asyncio.get_running_loop()
+        self.main_task = asyncio.current_task()
+        if threading.current_thread() is threading.main_thread():
+            # SIGTERM akyrwnei to main() sto loop: ena sys.exit mesa se kapoio
+            # callback tha to epiane opoio except vriskotan ekei
+            loop.add_signal_handler(signal.SIGTERM, self.stop)
+        self.update_event = asyncio.Event()
+        self.scheduler.wakeup = lambda: loop.call_soon_threadsafe(self.update_event.set)
+        if self.liveness:
+            # To liveness thread den kleinei to TCP session tou geitona apeutheias:
+            # ta writers/transports kleinoun mono apo to loop
+            on_down = self.liveness.on_down
+            self.liveness.on_down = lambda name: loop.call_soon_threadsafe(on_down, name)
+
+        if self.rx_workers:
+            # Ta batches twn receive workers diavazontai otan to pipe ginei readable
+            await loop.run_in_executor(None, self.start_ingest_workers)
+            for conn in self.ingest.conns:
+                loop.add_reader(conn.fileno(), self.read_batch, loop, conn)
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RCVBUF)
+            sock.bind(('0.0.0.0', self.udp_port))
+            await loop.create_datagram_endpoint(lambda: DVProtocol(self), sock=sock)
+            log.info('UDP', "Listening on 0.0.0.0:{port}", port=self.udp_port)
+
+        server = await asyncio.start_server(self.accept_stream, '0.0.0.0', self.tcp_port, reuse_address=True)
+        tasks = [asyncio.create_task(c) for c in (self.periodic_loop(), self.hello_loop(),
+                                                   self.expiry_loop(), self.scheduler_loop(),
+                                                   self.connect_all())]
+        async with server:
+            await asyncio.gather(*tasks)
+
+    def run(self):
+        self.start_metrics()
+        self.fib.start()
+        if self.liveness:
+            self.liveness.start()
+        try:
+            asyncio.run(self.main())
+        except (KeyboardInterrupt, asyncio.CancelledError): pass
+        finally:
+            log.info('System', "Exit")
+            self.shutdown()
+
+    def stop(self):
+        super().stop()
+        if self.main_task is not None:
+            self.loop.call_soon_threadsafe(self.main_task.cancel)
@@ -0,0 +1,121 @@
+# Latency tou receive path (process_dv_update) kai twn Hello oso alla threads
+# doulevoun sto idio table: periodic full sends se olous tous geitones, o
+# garbage collector, to dump tou table kai to snapshot tou restart file.
+#  quiet: mono to receive path
+#  busy:  me ola ta parapanw na trexoun synexeia
+# Xrhsh: python benchmarks/contention_bench.py [prefixes] [neighbors] [seconds]
+import contextlib
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'messages'))
+from log import log
+from route_table import prefix_key
+from router import Router
+
+DELTA = 20            # routes ana delta update
+RECV_INTERVAL = 0.002 # sec metaksy updates sto receive path
+HELLO_INTERVAL = 0.001
+
+
+class NullSocket:
+    def sendto(self, data, addr):
+        pass
+
+
+def setup(n, neighbors, restart_file):
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        router = Router('ra', 0, 0, [], fib_backend='fake', restart_file=restart_file, transport=NullSocket())
+    router.scheduler.trigger = lambda: None
+    with router.lock:
+        for i in range(neighbors):
+            router.register_neighbor(f'r{i}', None, '127.0.0.1', 0, 2)
+
+    # Olo to table mathainetai apo ton r0, se updates opws ftanoun apo to diktyo
+    keys = [prefix_key(f"10.{(i >> 8) & 0xff}.{i & 0xff}.0/24") for i in range(n)]
+    for seq, start in enumerate(range(0, n, 500)):
+        router.process_dv_update('r0', [(key, 1) for key in keys[start:start + 500]], seq, delta=True)
+    router.send_dv_updates(triggered=False)
+    return router, keys
+
+
+def percentiles(samples):
+    samples.sort()
+    pick = lambda q: samples[min(int(len(samples) * q), len(samples) - 1)] * 1000
+    return f"p50 {pick(0.5):7.3f} ms  p99 {pick(0.99):7.3f} ms  max {samples[-1] * 1000:7.3f} ms"
+
+
+def loop(stop, interval, fn):
+    while not stop.is_set():
+        fn()
+        time.sleep(interval)
+
+
+def run(busy, n, neighbors, seconds, restart_file):
+    router, keys = setup(n, neighbors, restart_file)
+    stop = threading.Event()
+    hellos = []
+
+    def hello():
+        t = time.perf_counter()
+        router.hello_received('r1')
+        hellos.append(time.perf_counter() - t)
+
+    def gc():
+        router.expire(router.clock())
+        router.print_routing_table()
+        router.save_snapshot()
+
+    threads = [threading.Thread(target=loop, args=(stop, HELLO_INTERVAL, hello))]
+    if busy:
+        threads.append(threading.Thread(target=loop, args=(stop, 0.01, lambda: router.send_dv_updates(triggered=False))))
+        threads.append(threading.Thread(target=loop, args=(stop, 0.05, gc)))
+    for t in threads:
+        t.start()
+
+    receives = []
+    seq = 10 ** 6
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        # Kathe delta allazei to metric DELTA routes, opote to table allazei version
+        start = (seq * DELTA) % (n - DELTA)
+        routes = [(key, 1 + seq % 2) for key in keys[start:start + DELTA]]
+        t = time.perf_counter()
+        router.process_dv_update('r0', routes, seq, delta=True)
+        receives.append(time.perf_counter() - t)
+        seq += 1
+        time.sleep(RECV_INTERVAL)
+
+    stop.set()
+    for t in threads:
+        t.join()
+    sent = router.tx_datagrams.value
+    return receives, hellos, sent
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    neighbors = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+
+    # To dump grafetai sto log: to kratame ektos output
+    log.configure(level='error')
+    restart_file = os.path.join(tempfile.mkdtemp(prefix='dv-bench-'), 'table')
+
+    print(f"{n} routes, {neighbors} neighbors, delta updates of {DELTA} routes every {RECV_INTERVAL * 1000:.0f} ms")
+    for busy in (False, True):
+        receives, hellos, sent = run(busy, n, neighbors, seconds, restart_file)
+        name = 'busy' if busy else 'quiet'
+        print(f"{name:<6} receive ({len(receives):5} updates): {percentiles(receives)}")
+        print(f"{name:<6} hello   ({len(hellos):5} hellos):  {percentiles(hellos)}")
+        if busy:
+            print(f"       {sent} datagrams sent by the periodic sender")
+
+
+if __name__ == '__main__':
+    main()
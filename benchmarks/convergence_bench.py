@@ -0,0 +1,84 @@
+# Xronos sygklishs, mhnymata kai megethos table ston simulator (simulator.py),
+# gia tis topologies ring, grid, random kai thn topologia tou README.
+# Gia kathe topologia: arxikh sygklish, meta apotyxia enos link, meta enos router
+# kai telos restart enos allou router (me --graceful-restart to table tou sozetai).
+# Xrhsh: python benchmarks/convergence_bench.py [--size N] [--seed S] [--prefixes K] [--summarize] [--ecmp]
+#        [--graceful-restart] [--json]
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'messages'))
+sys.path.insert(0, ROOT)
+from simulator import build, ring, grid, random_graph, reference
+
+
+def scenarios(size, seed, per_router):
+    side = max(2, int(round(size ** 0.5)))
+    return [
+        ('reference', reference()),
+        (f'ring-{size}', ring(size, per_router)),
+        (f'grid-{side}x{side}', grid(side, side, per_router)),
+        (f'random-{size}', random_graph(size, 3, seed, per_router)),
+    ]
+
+
+def run(name, topology, seed, **options):
+    rnd = random.Random(seed)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        network, links = build(topology, seed=seed, **options)
+        results = [network.phase('initial')]
+        a, b = rnd.choice(links)
+        network.fail_link(a, b)
+        results.append(network.phase(f'link {a}-{b} down'))
+        victim = rnd.choice([n for n in network.routers if n not in (a, b)])
+        network.fail_node(victim)
+        results.append(network.phase(f'router {victim} down'))
+        restarted = rnd.choice([n for n in network.routers if n not in network.down])
+        network.restart_node(restarted)
+        results.append(network.phase(f'router {restarted} restart'))
+    for result in results:
+        result['topology'] = name
+        yield result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=100, help="routers in ring/random, ~size in grid (default: 100)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.001, help="link latency in seconds (default: 1 ms)")
+    parser.add_argument('--prefixes', type=int, default=1, help="contiguous /24s originated per router (default: 1)")
+    parser.add_argument('--summarize', action='store_true', help="routers summarize advertisements inside 10.0.0.0/8")
+    parser.add_argument('--ecmp', action='store_true', help="routers keep all equal-cost next hops")
+    parser.add_argument('--graceful-restart', action='store_true',
+                        help="routers snapshot their table and neighbors keep their routes across a restart")
+    parser.add_argument('--json', action='store_true', help="one JSON object per line, for comparing commits")
+    args = parser.parse_args()
+
+    if not args.json:
+        print(f"{'topology':<14} {'event':<24} {'routers':>7} {'converged':>10} {'messages':>9} "
+              f"{'bytes':>10} {'peak':>6} {'wrong':>6} {'longer':>6} {'events':>8} {'wall':>7}")
+    options = {'latency': args.latency}
+    if args.summarize:
+        options['summarize'] = ['10.0.0.0/8']
+    if args.ecmp:
+        options['ecmp'] = True
+    if args.graceful_restart:
+        options['graceful_restart'] = True
+    for name, topology in scenarios(args.size, args.seed, args.prefixes):
+        for r in run(name, topology, args.seed, **options):
+            if args.json:
+                print(json.dumps(r), flush=True)
+            else:
+                print(f"{r['topology']:<14} {r['event']:<24} {r['routers']:>7} {r['converged_s']:>9.3f}s "
+                      f"{r['messages']:>9} {r['bytes']:>10} {r['peak_routes']:>6} {r['wrong_routes']:>6} {r['longer_paths']:>6} "
+                      f"{r['events']:>8} {r['wall_s']:>6.2f}s"
+                      + (f" {r['compression']:>5.1f}x" if 'compression' in r else ""), flush=True)
+
+
+if __name__ == '__main__':
+    main()
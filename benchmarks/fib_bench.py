@@ -0,0 +1,51 @@
+# Metraei to throughput tou FibManager me to fake backend (xwris root).
+# Xrhsh: python benchmarks/fib_bench.py [prefixes] [op_cost_us]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from fib import FakeBackend, FibManager
+
+
+def prefixes(n):
+    for i in range(n):
+        yield f"10.{(i >> 16) & 0xff}.{(i >> 8) & 0xff}.{i & 0xff}/32"
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    op_cost = float(sys.argv[2]) / 1e6 if len(sys.argv) > 2 else 0.0
+
+    backend = FakeBackend(op_cost=op_cost)
+    fib = FibManager(backend, batch_size=1024)
+    names = list(prefixes(n))
+
+    t0 = time.perf_counter()
+    for p in names:
+        fib.set(p, ('192.168.1.3',))
+    t1 = time.perf_counter()
+    fib.flush()
+    t2 = time.perf_counter()
+
+    # Allagh next-hop gia ta misa, diagrafh gia to ena tetarto
+    for p in names[:n // 2]:
+        fib.set(p, ('192.168.1.19',))
+    for p in names[n // 2:n // 2 + n // 4]:
+        fib.withdraw(p)
+    # Ksana idia timh: den prepei na paragei kernel ops
+    for p in names[-(n // 4):]:
+        fib.set(p, ('192.168.1.3',))
+    t3 = time.perf_counter()
+    changed = fib.flush()
+    t4 = time.perf_counter()
+
+    print(f"install    {n:>8} routes  enqueue {t1 - t0:.3f}s  flush {t2 - t1:.3f}s  "
+          f"({n / (t2 - t0):,.0f} routes/s, {backend.batches} batches)")
+    print(f"churn      {changed:>8} ops     enqueue {t3 - t2:.3f}s  flush {t4 - t3:.3f}s  "
+          f"({changed / (t4 - t2):,.0f} ops/s)")
+    print(f"kernel view {len(backend.routes)} routes, {backend.ops} ops total")
+
+
+if __name__ == '__main__':
+    main()
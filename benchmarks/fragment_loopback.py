@@ -0,0 +1,56 @@
+# Stelnei ena megalo routing table (default 50k prefixes) apo enan router
+# se enan allo panw apo loopback kai elegxei oti ftanoun ola ta routes.
+# Xrhsh: python benchmarks/fragment_loopback.py [prefixes] [mtu] [wire version]
+import contextlib
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'messages'))
+from route_table import prefix_key
+from router import Router
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    mtu = int(sys.argv[2]) if len(sys.argv) > 2 else 1500
+    wire = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        sender = Router('ra', 0, 47001, [], fib_backend='fake', mtu=mtu)
+        receiver = Router('rb', 0, 47002, [], fib_backend='fake', mtu=mtu)
+    sender.routing_table.clear()
+    receiver.routing_table.clear()
+    with sender.lock:
+        sender.register_neighbor('rb', None, '127.0.0.1', 47002, wire)
+    with receiver.lock:
+        receiver.register_neighbor('ra', None, '127.0.0.1', 47001, wire)
+
+    for i in range(n):
+        prefix = f"10.{(i >> 8) & 0xff}.{i & 0xff}.0/24" if i < 65536 else f"11.{(i >> 16) & 0xff}.{(i >> 8) & 0xff}.{i & 0xff}/32"
+        key = prefix_key(prefix)
+        sender.mark_changed(key, sender.routing_table.set_key(key, '-', 0, time.time()))
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        threading.Thread(target=receiver.start_udp_server, daemon=True).start()
+        time.sleep(0.2)
+        t0 = time.perf_counter()
+        sender.send_dv_updates(triggered=True)
+        t1 = time.perf_counter()
+        deadline = time.time() + 30
+        while len(receiver.routing_table) < n and time.time() < deadline:
+            time.sleep(0.05)
+        t2 = time.perf_counter()
+
+    datagrams = len(receiver.active_neighbors['ra']['seen_fragments'])
+    print(f"{n} prefixes, mtu {mtu}, wire v{wire}: sent in {t1 - t0:.2f}s, {datagrams} datagrams received, "
+          f"{len(receiver.routing_table)} routes learned after {t2 - t0:.2f}s")
+    if len(receiver.routing_table) != n:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# Stress tou TCP framing: stelnei xiliades Hello back-to-back se mia syndesh
+# (ola mazi se ena sendall, kai se tyxaia kommatia) kai elegxei oti o router
+# ta diavazei ola, xwris na xathei kanena kai xwris na kleisei h syndesh.
+# Elegxei kai enan palio peer (xwris framing): to handshake tou kai ta Hello
+# tou ftanoun san ena mhnyma ana recv, kai o router tou apantaei to idio.
+# O palios peer den stelnei header.version, opote pairnei updates se wire v1.
+# Xrhsh: python benchmarks/hello_stress.py [hellos]
+import contextlib
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'messages'))
+import dv_pb2
+from framing import FrameReader, encode_frame, encode_handshake
+from route_table import prefix_key
+from router import Router
+
+
+def check_reader(n):
+    # Kathara to FrameReader: ta idia frames kommena se tyxaia kommatia
+    hello = dv_pb2.HelloMessage()
+    hello.header.router_id = 'rx'
+    stream = encode_frame(hello) * n
+    reader = FrameReader()
+    got = 0
+    pos = 0
+    while pos < len(stream):
+        step = random.randint(1, 64)
+        got += len(reader.feed(stream[pos:pos + step]))
+        pos += step
+    return got
+
+
+def start_router(send=False):
+    router = Router('rt', 0, 0, [], fib_backend='fake')
+    received = []
+    router.hello_received = lambda name: received.append(name)
+    if not send:
+        router.send_dv_updates = lambda triggered=False: None
+
+    ours, theirs = socket.socketpair()
+    t = threading.Thread(target=router.handle_connection, args=(ours, ('127.0.0.1', 0), False), daemon=True)
+    t.start()
+    return router, received, theirs, t
+
+
+def check_router(n):
+    router, received, theirs, t = start_router()
+
+    params = dv_pb2.ConnParamMessage()
+    params.header.router_id = 'rx'
+    params.port = 1
+    hello = dv_pb2.HelloMessage()
+    hello.header.router_id = 'rx'
+
+    start = time.perf_counter()
+    # To handshake kai ola ta Hello se ena buffer: to TCP ta enwnei opws thelei
+    theirs.sendall(encode_handshake(params) + encode_frame(hello) * n)
+    deadline = time.time() + 30
+    while len(received) < n and time.time() < deadline:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    alive = 'rx' in router.active_neighbors
+    theirs.recv(4096)  # h apanthsh tou handshake, gia na kleisei kathara
+    theirs.close()
+    t.join(timeout=5)
+    return len(received), elapsed, alive
+
+
+def check_legacy(n):
+    # Palios peer: to handshake kai kathe Hello se diko tou send, xwris frame
+    router, received, theirs, t = start_router(send=True)
+    with router.lock:
+        key = prefix_key('10.99.0.0/24')
+        router.mark_changed(key, router.routing_table.set_key(key, '-', 0, router.clock()))
+    udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udp.bind(('127.0.0.1', 0))
+    udp.settimeout(3)
+    params = dv_pb2.ConnParamMessage()
+    params.header.router_id = 'rx'
+    params.port = udp.getsockname()[1]
+    theirs.sendall(params.SerializeToString())
+    theirs.settimeout(3)
+    # Etsi to diavazei enas palios router: ena recv, ParseFromString
+    reply = dv_pb2.ConnParamMessage()
+    reply.ParseFromString(theirs.recv(1024))
+    # To full table meta to handshake: se v1, me Route messages
+    update = dv_pb2.DVMessage()
+    update.ParseFromString(udp.recv(65535))
+    wire = update.header.version if update.routes and not update.addrs else None
+    hello = dv_pb2.HelloMessage()
+    hello.header.router_id = 'rx'
+    for _ in range(n):
+        theirs.sendall(hello.SerializeToString())
+        time.sleep(0.01)
+    deadline = time.time() + 5
+    while len(received) < n and time.time() < deadline:
+        time.sleep(0.01)
+    # To Hello tou router pros ton palio peer einai ena skueto HelloMessage
+    router.send_hellos()
+    ours = dv_pb2.HelloMessage()
+    ours.ParseFromString(theirs.recv(1024))
+    alive = 'rx' in router.active_neighbors
+    theirs.close()
+    udp.close()
+    t.join(timeout=5)
+    return reply.header.router_id == 'rt' and ours.header.router_id == 'rt', wire, len(received), alive
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    got = check_reader(n)
+    print(f"FrameReader: {got}/{n} frames from randomly split stream")
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        got_router, elapsed, alive = check_router(n)
+    print(f"Router: {got_router}/{n} hellos in {elapsed:.3f}s ({got_router / elapsed:,.0f}/s), "
+          f"neighbor still up: {alive}")
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        handshake, wire, got_legacy, legacy_alive = check_legacy(20)
+    print(f"Unframed peer: handshake {'ok' if handshake else 'FAILED'}, updates in wire v{wire}, "
+          f"{got_legacy}/20 hellos, neighbor still up: {legacy_alive}")
+    if (got != n or got_router != n or not alive or not handshake or wire != 1
+            or got_legacy != 20 or not legacy_alive):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
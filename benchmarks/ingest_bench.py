@@ -0,0 +1,144 @@
+# Replay: kataskeuazei ta updates pou tha estelnan S geitones me R routes o
+# kathenas (R periodic full tables, wire v1 h v2), ta ksanastelnei apo ena
+# allo process, apo ena UDP socket ana geitona, kai metraei posa routes/sec
+# efarmozei o router, me to UDP thread (0 workers) h me receive workers.
+# Ektos apo to throughput grafei kai to CPU tou kyriou process ana route:
+# auto einai to seiriako kommati kai orizei pou stamatei h klimakwsh.
+# Xrhsh: python benchmarks/ingest_bench.py [senders] [routes] [rounds] [wire] [workers,...]
+import contextlib
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'messages'))
+import dv_pb2
+from log import log
+from route_table import prefix_key
+from router import Router, IP_UDP_OVERHEAD
+from updates import UpdateCache, encode_header
+
+PORT = 47100
+WINDOW = 128   # datagrams "sto dromo": o replayer den gemizei to receive buffer
+
+
+def record(senders, routes, rounds, wire):
+    # Ta datagrams kathe geitona, ana round, opws ta vgazei to send_dv_updates
+    keys = [prefix_key(f"10.{(i >> 8) & 0xff}.{i & 0xff}.0/24") for i in range(routes)]
+    header = dv_pb2.DVHeader(version=1, router_id='r000', seq=2**63, sent_at_ms=2**63,
+                             fragment=2**31, fragment_count=2**31)
+    cache = UpdateCache(1500 - IP_UDP_OVERHEAD - len(encode_header(header)), 16)
+    cache.update(1, {key: ('x', 1) for key in keys})
+    bodies = [body for body, _ in cache.datagrams('ra', wire)]
+    recording = []
+    for s in range(senders):
+        name = f'r{s:03}'
+        recording.append([[encode_header(dv_pb2.DVHeader(version=wire, router_id=name, seq=seq + 1, fragment=i,
+                                                         fragment_count=len(bodies))) + body
+                           for i, body in enumerate(bodies)] for seq in range(rounds)])
+    return recording
+
+
+def replay(recording, start_round, port, applied, go):
+    # Trexei se allo process: ena socket ana geitona, datagrams enallax apo olous
+    socks = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in recording]
+    go.wait()
+    sent = 0
+    for rnd in range(start_round, len(recording[0])):
+        for i in range(len(recording[0][rnd])):
+            for sock, rounds in zip(socks, recording):
+                while sent - applied.value >= WINDOW:
+                    time.sleep(0.0002)
+                sock.sendto(rounds[rnd][i], ('127.0.0.1', port))
+                sent += 1
+
+
+def cpu_seconds(pid):
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def run(workers, port, recording, ctx):
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        router = Router('ra', 0, port, [], fib_backend='fake', rx_workers=workers)
+    router.scheduler.trigger = lambda: None
+    with router.lock:
+        for s in range(len(recording)):
+            router.register_neighbor(f'r{s:03}', None, '127.0.0.1', 0, 2)
+    applied = ctx.Value('q', 0, lock=False)
+    counts = [0]
+    process = router.process_dv_update
+
+    def counted(sender, routes, *args):
+        process(sender, routes, *args)
+        counts[0] += len(routes)
+        applied.value += 1
+    router.process_dv_update = counted
+
+    if workers:
+        router.start_ingest_workers()
+    target = router.ingest_loop if workers else router.start_udp_server
+    threading.Thread(target=target, daemon=True).start()
+    router.udp_ready.wait(30)
+
+    total = sum(len(rounds[0]) for rounds in recording)
+    results = []
+    # To prwto round gemizei to table (kainouria routes), ta epomena einai
+    # ta periodic updates pou den allazoun tipota
+    for phase, first, last in (('learn', 0, 1), ('steady', 1, len(recording[0]))):
+        go = ctx.Event()
+        applied.value = 0
+        counts[0] = 0
+        replayer = ctx.Process(target=replay, args=([r[:last] for r in recording], first, port, applied, go), daemon=True)
+        replayer.start()
+        expected = total * (last - first)
+        pids = [proc.pid for proc in router.ingest.procs] if router.ingest else []
+        worker_cpu = sum(cpu_seconds(pid) for pid in pids)
+        cpu = time.process_time()
+        t0 = time.perf_counter()
+        go.set()
+        stalled = time.perf_counter()
+        seen = 0
+        while applied.value < expected:
+            if applied.value != seen:
+                seen = applied.value
+                stalled = time.perf_counter()
+            elif time.perf_counter() - stalled > 2:
+                break
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - t0
+        cpu = time.process_time() - cpu
+        worker_cpu = sum(cpu_seconds(pid) for pid in pids) - worker_cpu
+        replayer.join()
+        results.append((phase, applied.value, expected, counts[0], elapsed, cpu, worker_cpu))
+    if router.ingest:
+        router.ingest.close()
+    return results
+
+
+def main():
+    senders = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    routes = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    wire = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+    workers = [int(w) for w in sys.argv[5].split(',')] if len(sys.argv) > 5 else [0, 1, 2, 4]
+
+    log.configure(level='error')
+    ctx = multiprocessing.get_context('spawn')
+    recording = record(senders, routes, rounds, wire)
+    print(f"{senders} senders x {routes} routes x {rounds} rounds, wire v{wire}, "
+          f"{sum(len(r[0]) for r in recording)} datagrams per round, {os.cpu_count()} CPUs")
+    for i, w in enumerate(workers):
+        for phase, done, expected, count, elapsed, cpu, worker_cpu in run(w, PORT + i, recording, ctx):
+            lost = f", {expected - done} datagrams lost" if done < expected else ""
+            print(f"workers {w}  {phase:<6} {count / elapsed:>10,.0f} routes/s  "
+                  f"router CPU {cpu / count * 1e6:5.2f} us/route  workers CPU {worker_cpu / count * 1e6:5.2f} us/route{lost}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# Mnhmh kai longest-prefix-match lookup gia to RouteTable, se sygkrish me to
+# palio dict apo string CIDR -> dict entry.
+# Xrhsh: python benchmarks/route_table_bench.py [prefixes ...]
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from route_table import RouteTable, address_int, prefix_key, MASKS
+
+NEXT_HOPS = ['r1', 'r2', 'r3', 'r4', 'r5']
+LOOKUPS = 100000
+
+
+def gen_prefixes(n):
+    # Mix apo /16, /24 kai /32, opws se ena table me summaries kai host routes
+    rnd = random.Random(1)
+    seen = set()
+    out = []
+    while len(out) < n:
+        plen = rnd.choice((16, 24, 24, 24, 32))
+        net = rnd.getrandbits(32) & MASKS[plen]
+        if (net, plen) in seen:
+            continue
+        seen.add((net, plen))
+        out.append(f"{net >> 24}.{(net >> 16) & 255}.{(net >> 8) & 255}.{net & 255}/{plen}")
+    return out
+
+
+def measure(build):
+    tracemalloc.start()
+    table = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return table, size
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [100000, 1000000]
+    for n in sizes:
+        prefixes = gen_prefixes(n)
+        # Ta strings twn prefixes yparxoun kai stis dyo periptwseis (erxontai apo to wire)
+        # opote den ta metrame.
+
+        def legacy():
+            # To next_hop apo to protobuf parse einai neo string se kathe route
+            table = {}
+            for i, p in enumerate(prefixes):
+                table[p] = {'next_hop': (NEXT_HOPS[i % 5] + ' ')[:-1], 'metric': i % 15, 'timestamp': time.time()}
+            return table
+
+        def compact():
+            table = RouteTable()
+            for i, p in enumerate(prefixes):
+                table.set(p, (NEXT_HOPS[i % 5] + ' ')[:-1], i % 15, time.time())
+            return table
+
+        _, legacy_size = measure(legacy)
+        t0 = time.perf_counter()
+        table, compact_size = measure(compact)
+        build_time = time.perf_counter() - t0
+
+        rnd = random.Random(2)
+        addrs = [rnd.getrandbits(32) for _ in range(LOOKUPS // 2)]
+        # Misa apo ta lookups pesoun sigoura mesa se kapoio prefix
+        for p in rnd.sample(prefixes, LOOKUPS // 2):
+            key = prefix_key(p)
+            addrs.append((key >> 6) | rnd.getrandbits(32 - (key & 63)) if key & 63 < 32 else key >> 6)
+
+        t0 = time.perf_counter()
+        hits = sum(1 for a in addrs if table.lookup(a) is not None)
+        lookup_time = time.perf_counter() - t0
+
+        print(f"{n:>8} prefixes: dict-of-dicts {legacy_size / n:6.0f} B/route, "
+              f"RouteTable {compact_size / n:6.0f} B/route ({legacy_size / compact_size:.1f}x smaller), "
+              f"build {build_time:.2f}s")
+        print(f"{'':>8}           LPM {LOOKUPS} lookups in {lookup_time:.3f}s "
+              f"({lookup_time / LOOKUPS * 1e6:.2f} us/lookup, {hits} hits)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# Sygkrish twn runtimes (threads / asyncio) me N pseudo-geitones panw apo loopback.
+# Gia kathe runtime ksekinaei ton router.py san ksexwristo process, syndeei N geitones,
+# kai metraei threads, RSS kai to latency enos triggered update: enas geitonas
+# diafhmizei ena neo prefix kai metrame pote to lamvanei enas allos geitonas.
+# Xrhsh: python benchmarks/runtime_bench.py [N ...]
+import os
+import select
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'messages'))
+sys.path.insert(0, ROOT)
+import dv_pb2
+from framing import encode_handshake, read_handshake
+
+TRIALS = 20
+
+
+class FakeNeighbor:
+    def __init__(self, name, tcp_port):
+        self.name = name
+        self.udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp.bind(('127.0.0.1', 0))
+        self.tcp = socket.create_connection(('127.0.0.1', tcp_port))
+        my = dv_pb2.ConnParamMessage()
+        my.header.router_id = name
+        my.port = self.udp.getsockname()[1]
+        self.tcp.sendall(encode_handshake(my))
+        read_handshake(self.tcp)
+        self.seq = 0
+
+    def advertise(self, udp_port, prefix):
+        self.seq += 1
+        msg = dv_pb2.DVMessage()
+        msg.header.router_id = self.name
+        msg.header.seq = self.seq
+        msg.header.fragment_count = 1
+        msg.header.delta = True
+        msg.routes.add(prefix=prefix, next_hop='-', metric=1)
+        self.udp.sendto(msg.SerializeToString(), ('127.0.0.1', udp_port))
+
+    def wait_for(self, prefix, timeout=5.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            ready, _, _ = select.select([self.udp], [], [], deadline - time.time())
+            if not ready:
+                break
+            msg = dv_pb2.DVMessage()
+            msg.ParseFromString(self.udp.recv(65535))
+            if any(r.prefix == prefix for r in msg.routes):
+                return time.perf_counter()
+        return None
+
+    def drain(self):
+        while select.select([self.udp], [], [], 0)[0]:
+            self.udp.recv(65535)
+
+
+def proc_status(pid):
+    status = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            status[key] = value.strip()
+    return int(status['Threads']), int(status['VmRSS'].split()[0]) // 1024
+
+
+def run(runtime, n, base_port):
+    tcp_port, udp_port = base_port, base_port + 1
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, 'messages'))
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, 'router.py'), 'rt', str(tcp_port), str(udp_port),
+                             '--fib', 'fake', '--runtime', runtime,
+                             '--hold-min', '0', '--hold-max', '0', '--neighbor-interval', '0'],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(1.0)
+        neighbors = [FakeNeighbor(f"n{i}", tcp_port) for i in range(n)]
+        time.sleep(0.5)
+        for nb in neighbors:
+            nb.drain()
+
+        latencies = []
+        for t in range(TRIALS):
+            src = neighbors[t % n]
+            dst = neighbors[(t + 1) % n]
+            prefix = f"198.18.{t}.0/24"
+            start = time.perf_counter()
+            src.advertise(udp_port, prefix)
+            end = dst.wait_for(prefix)
+            if end is not None:
+                latencies.append((end - start) * 1000)
+            for nb in neighbors:
+                nb.drain()
+
+        threads, rss = proc_status(proc.pid)
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] if latencies else float('nan')
+        worst = latencies[-1] if latencies else float('nan')
+        print(f"{runtime:<8} N={n:<4} threads={threads:<5} rss={rss:>4} MB  "
+              f"update latency p50={p50:.2f} ms max={worst:.2f} ms ({len(latencies)}/{TRIALS})")
+        for nb in neighbors:
+            nb.tcp.close()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [10, 50, 200]
+    port = 47100
+    for n in sizes:
+        for runtime in ('threads', 'asyncio'):
+            run(runtime, n, port)
+            port += 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# Sygkrish twn wire formats twn DV updates: bytes ana route, datagrams gia
+# olo to table kai xronos parse (ParseFromString + decode_routes) ana route.
+# Xrhsh: python benchmarks/wire_bench.py [prefixes] [mtu]
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'messages'))
+import dv_pb2
+from route_table import prefix_key
+from updates import UpdateCache, encode_header, decode_routes
+
+IP_UDP_OVERHEAD = 28
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    mtu = int(sys.argv[2]) if len(sys.argv) > 2 else 1500
+
+    # Mix apo /24 kai /32 me 4 next hops, opws ena table pou mathame apo geitones
+    table = {}
+    for i in range(n):
+        prefix = f"10.{(i >> 8) & 0xff}.{i & 0xff}.0/24" if i < 65536 else f"11.{(i >> 16) & 0xff}.{(i >> 8) & 0xff}.{i & 0xff}/32"
+        table[prefix_key(prefix)] = (f"r{i % 4}", 1 + i % 15)
+
+    header = dv_pb2.DVHeader(version=2, router_id='r1', seq=2**63, sent_at_ms=2**63,
+                             fragment=2**31, fragment_count=2**31)
+    budget = mtu - IP_UDP_OVERHEAD - len(encode_header(header))
+    cache = UpdateCache(budget, 16)
+    cache.update(1, table)
+
+    for wire in (1, 2):
+        t0 = time.perf_counter()
+        datagrams = cache.datagrams('neighbor', wire)
+        encode_time = time.perf_counter() - t0
+        payloads = [encode_header(dv_pb2.DVHeader(version=wire, router_id='r1', seq=1, sent_at_ms=int(time.time() * 1000),
+                                                  fragment=i, fragment_count=len(datagrams))) + body
+                    for i, (body, _) in enumerate(datagrams)]
+        route_bytes = sum(len(body) for body, _ in datagrams)
+
+        t0 = time.perf_counter()
+        parsed = 0
+        for data in payloads:
+            msg = dv_pb2.DVMessage()
+            msg.ParseFromString(data)
+            parsed += len(decode_routes(msg))
+        parse_time = time.perf_counter() - t0
+        assert parsed == n
+
+        print(f"wire v{wire}: {route_bytes / n:5.1f} bytes/route, {len(datagrams)} datagrams (mtu {mtu}), "
+              f"encode {encode_time:.2f}s, parse {parse_time / n * 1e6:.2f} us/route")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+import re
+import socket
+import struct
+import subprocess
+import threading
+import time
+
+from log import log
+
+# FIB programming: krataei sth mnhmh ti exei egkatastathei sto kernel,
+# ypologizei th diafora desired/installed kai th stelnei se batches
+# apo ena diko tou thread, ekswn apo to lock tou router.
+
+# --- rtnetlink constants (linux/netlink.h, linux/rtnetlink.h) ---
+NETLINK_ROUTE = 0
+NLMSG_ERROR = 2
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+NLM_F_REQUEST = 0x01
+NLM_F_ACK = 0x04
+NLM_F_REPLACE = 0x100
+NLM_F_CREATE = 0x400
+RT_TABLE_MAIN = 254
+RTPROT_BOOT = 3
+RT_SCOPE_UNIVERSE = 0
+RT_SCOPE_NOWHERE = 255
+RTN_UNICAST = 1
+RTA_DST = 1
+RTA_GATEWAY = 5
+RTA_MULTIPATH = 9
+ESRCH = 3
+
+ACK_TIMEOUT = 5.0   # sec pou perimenoume ta netlink ACKs enos batch
+RETRY_MIN = 0.5     # sec prin ksanadokimasoume ena prefix pou apetyxe, diplasiazetai
+RETRY_MAX = 30.0
+
+
+class FakeBackend:
+    # Backend xwris kernel: gia benchmarks kai gia treksimo xwris root
+    def __init__(self, op_cost=0.0):
+        self.op_cost = op_cost
+        self.routes = {}
+        self.ops = 0
+        self.batches = 0
+
+    def apply(self, ops):
+        self.batches += 1
+        for op, prefix, gateways in ops:
+            if op == 'replace':
+                self.routes[prefix] = gateways
+            else:
+                self.routes.pop(prefix, None)
+            self.ops += 1
+        if self.op_cost:
+            time.sleep(self.op_cost * len(ops))
+        return set()
+
+
+class IpBatchBackend:
+    # Ena "ip -batch -" process ana batch anti gia ena fork ana route
+    FAILED_RE = re.compile(r'Command failed -:(\d+)')
+
+    def apply(self, ops):
+        lines = []
+        for op, prefix, gateways in ops:
+            if op == 'replace':
+                if len(gateways) == 1:
+                    lines.append(f"route replace {prefix} via {gateways[0]}")
+                else:
+                    hops = " ".join(f"nexthop via {gw}" for gw in gateways)
+                    lines.append(f"route replace {prefix} {hops}")
+            else:
+                lines.append(f"route del {prefix}")
+
+        proc = subprocess.run(['ip', '-force', '-batch', '-'], input="\n".join(lines) + "\n",
+                              capture_output=True, text=True)
+        failed = set()
+        if proc.returncode != 0:
+            for m in self.FAILED_RE.finditer(proc.stderr):
+                op, prefix, _ = ops[int(m.group(1)) - 1]
+                # To del enos route pou den yparxei den einai sfalma
+                if op == 'replace':
+                    failed.add(prefix)
+        return failed
+
+
+class NetlinkBackend:
+    # Apeutheias rtnetlink: ola ta mhnymata tou batch se ena sendto, meta diavazoume ta ACKs
+    MAX_CHUNK = 32768
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        self.sock.bind((0, 0))
+        # Ena xameno ACK den prepei na mplokarei to FIB thread gia panta
+        self.sock.settimeout(ACK_TIMEOUT)
+        self.seq = int(time.time())
+
+    @staticmethod
+    def _attr(rta_type, payload):
+        length = 4 + len(payload)
+        return struct.pack('=HH', length, rta_type) + payload + b'\0' * ((4 - length % 4) % 4)
+
+    def _encode(self, seq, op, prefix, gateways):
+        net, plen = prefix.split('/')
+        attrs = self._attr(RTA_DST, socket.inet_aton(net))
+        if op == 'replace':
+            msg_type = RTM_NEWROUTE
+            flags = NLM_F_REQUEST | NLM_F_ACK | NLM_F_CREATE | NLM_F_REPLACE
+            scope = RT_SCOPE_UNIVERSE
+            if len(gateways) == 1:
+                attrs += self._attr(RTA_GATEWAY, socket.inet_aton(gateways[0]))
+            else:
+                hops = b''
+                for gw in gateways:
+                    gw_attr = self._attr(RTA_GATEWAY, socket.inet_aton(gw))
+                    # struct rtnexthop: len, flags, hops, ifindex
+                    hops += struct.pack('=HBBi', 8 + len(gw_attr), 0, 0, 0) + gw_attr
+                attrs += self._attr(RTA_MULTIPATH, hops)
+        else:
+            msg_type = RTM_DELROUTE
+            flags = NLM_F_REQUEST | NLM_F_ACK
+            scope = RT_SCOPE_NOWHERE
+
+        rtm = struct.pack('=BBBBBBBBI', socket.AF_INET, int(plen), 0, 0,
+                          RT_TABLE_MAIN, RTPROT_BOOT, scope, RTN_UNICAST, 0)
+        body = rtm + attrs
+        return struct.pack('=IHHII', 16 + len(body), msg_type, flags, seq, 0) + body
+
+    def apply(self, ops):
+        pending = {}
+        buf = b''
+        for op, prefix, gateways in ops:
+            self.seq += 1
+            pending[self.seq] = (op, prefix)
+            buf += self._encode(self.seq, op, prefix, gateways)
+            if len(buf) >= self.MAX_CHUNK:
+                self.sock.sendto(buf, (0, 0))
+                buf = b''
+        if buf:
+            self.sock.sendto(buf, (0, 0))
+
+        failed = set()
+        while pending:
+            try:
+                data = self.sock.recv(65536)
+            except socket.timeout:
+                # Den kseroume an egine: ta ksanadokimazoume
+                failed.update(prefix for _, prefix in pending.values())
+                log.error('Kernel', "No netlink ACK for {count} route changes", count=len(pending))
+                break
+            offset = 0
+            while offset + 16 <= len(data):
+                length, msg_type, _, seq, _ = struct.unpack_from('=IHHII', data, offset)
+                if msg_type == NLMSG_ERROR and seq in pending:
+                    op, prefix = pending.pop(seq)
+                    error = -struct.unpack_from('=i', data, offset + 16)[0]
+                    if error and not (op == 'del' and error == ESRCH):
+                        failed.add(prefix)
+                offset += (length + 3) & ~3
+        return failed
+
+
+def parse_ip_routes(text):
+    # To output tou "ip route show": prefix -> tuple(gateways). Ta connected
+    # diktya den exoun gateway. Ta multipath routes exoun ta "nexthop via"
+    # stis epomenes grammes. To default kai ta host routes xwris "/" ta afhnoume.
+    routes = {}
+    prefix = None
+    for line in text.split('\n'):
+        parts = line.split()
+        if not parts:
+            continue
+        if line[0].isspace():
+            if prefix is not None and parts[0] == 'nexthop' and 'via' in parts:
+                routes[prefix] += (parts[parts.index('via') + 1],)
+            continue
+        prefix = parts[0] if '/' in parts[0] else None
+        if prefix is not None:
+            routes[prefix] = (parts[parts.index('via') + 1],) if 'via' in parts else ()
+    return routes
+
+
+def make_backend(name):
+    if name == 'netlink':
+        return NetlinkBackend()
+    if name == 'fake':
+        return FakeBackend()
+    return IpBatchBackend()
+
+
+class FibManager:
+    def __init__(self, backend, batch_size=512, flush_delay=0.05):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_delay = flush_delay
+
+        self.installed = {}   # prefix -> tuple(gateways), oti pisteuoume oti exei to kernel
+        self.desired = {}     # prefix -> tuple(gateways), oti thelei o router
+        self.dirty = set()
+        # Prefixes pou apetyxan sto kernel: prefix -> (pote ksanampainoun sto dirty, backoff)
+        self.backoff = {}
+        self.cond = threading.Condition()
+
+        self.installs = 0
+        self.removals = 0
+        self.failures = 0
+        self.retries = 0
+        self.batches = 0
+        # Proairetiko callback(seconds) meta apo kathe batch pros to kernel (metrics)
+        self.on_batch = None
+
+    def set(self, prefix, gateways):
+        with self.cond:
+            self.desired[prefix] = tuple(gateways)
+            self.dirty.add(prefix)
+            self.cond.notify()
+
+    def withdraw(self, prefix):
+        with self.cond:
+            self.desired.pop(prefix, None)
+            self.dirty.add(prefix)
+            self.cond.notify()
+
+    def adopt(self, prefix, gateways):
+        # Ena route pou vrhkame hdh sto kernel (apo to prohgoumeno process) to
+        # thewroume egkatesthmeno, opote den ksanagrafetai an den allaksei
+        with self.cond:
+            self.installed[prefix] = self.desired[prefix] = tuple(gateways)
+
+    def pending(self):
+        with self.cond:
+            return len(self.dirty)
+
+    def diff(self):
+        # Mono ta prefixes pou allaksan apo to teleutaio flush
+        with self.cond:
+            dirty, self.dirty = self.dirty, set()
+            ops = []
+            for prefix in dirty:
+                want = self.desired.get(prefix)
+                have = self.installed.get(prefix)
+                if want == have:
+                    self.backoff.pop(prefix, None)
+                    continue
+                if want is None:
+                    ops.append(('del', prefix, ()))
+                else:
+                    ops.append(('replace', prefix, want))
+        return ops
+
+    def flush(self):
+        ops = self.diff()
+        programmed = 0
+        for i in range(0, len(ops), self.batch_size):
+            batch = ops[i:i + self.batch_size]
+            start = time.perf_counter()
+            try:
+                failed = self.backend.apply(batch)
+            except Exception as e:
+                log.error('Kernel', "Kernel batch failed: {error}", error=e)
+                failed = {prefix for _, prefix, _ in batch}
+            if self.on_batch:
+                self.on_batch(time.perf_counter() - start)
+
+            with self.cond:
+                self.batches += 1
+                now = time.monotonic()
+                for op, prefix, gateways in batch:
+                    if prefix in failed:
+                        # Ksanadokimazetai me exponential backoff, alliws to kernel
+                        # menei diaforetiko apo to desired mexri na allaksei to route
+                        self.failures += 1
+                        _, delay = self.backoff.get(prefix, (None, RETRY_MIN / 2))
+                        delay = min(delay * 2, RETRY_MAX)
+                        self.backoff[prefix] = (now + delay, delay)
+                        continue
+                    self.backoff.pop(prefix, None)
+                    if op == 'replace':
+                        self.installed[prefix] = gateways
+                        self.installs += 1
+                    else:
+                        self.installed.pop(prefix, None)
+                        self.removals += 1
+                if failed:
+                    self.cond.notify()
+
+            for prefix in failed:
+                log.error('Kernel', "Failed to program route {prefix}", prefix=prefix)
+            programmed += len(batch) - len(failed)
+
+        if programmed:
+            log.info('Kernel', "Programmed {changes} route changes", changes=programmed)
+        return len(ops)
+
+    def requeue(self, now):
+        # Ta prefixes pou to backoff tous elhkse ksanampainoun sto dirty.
+        # Epistrefei posa sec mexri to epomeno (None: kanena).
+        with self.cond:
+            wait = None
+            for prefix, (at, delay) in self.backoff.items():
+                if at is None:
+                    continue
+                if at <= now:
+                    self.dirty.add(prefix)
+                    self.backoff[prefix] = (None, delay)
+                    self.retries += 1
+                elif wait is None or at - now < wait:
+                    wait = at - now
+            return wait
+
+    def run(self):
+        while True:
+            with self.cond:
+                while True:
+                    wait = self.requeue(time.monotonic())
+                    if self.dirty:
+                        break
+                    self.cond.wait(wait)
+            # Perimenoume ligo wste oi allages enos update na mpoun sto idio batch
+            time.sleep(self.flush_delay)
+            self.flush()
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
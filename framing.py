@@ -0,0 +1,106 @@
+from updates import encode_varint
+
+# Framing gia to TCP kanali (handshake kai Hello): kathe protobuf mhnyma
+# stelnetai me mprosta to mhkos tou se varint. Etsi ena recv mporei na periexei
+# polla mhnymata h kommati enos mhnymatos xwris na xathei tipota. To framing
+# synomologeitai sto handshake, opote enas palios router (ena mhnyma ana recv)
+# syndeetai akoma.
+
+MAX_FRAME = 64 * 1024
+# Tag tou ConnParamMessage.frame_length (pedio 5, varint)
+HANDSHAKE = b'\x28'
+
+
+def encode_frame(msg):
+    payload = msg.SerializeToString()
+    return encode_varint(len(payload)) + payload
+
+
+def encode_handshake(msg):
+    # To ConnParamMessage den mpainei se frame: enas palios router to diavazei
+    # me ena recv kai ParseFromString. Mprosta tou grafoume to pedio
+    # frame_length me to mhkos tou ypoloipou, dhladh tag + ena kanoniko frame.
+    # Ena palio ParseFromString agnoei to agnwsto pedio.
+    return HANDSHAKE + encode_frame(msg)
+
+
+class FrameReader:
+    def __init__(self, max_frame=MAX_FRAME):
+        self.buf = bytearray()
+        self.max_frame = max_frame
+
+    def feed(self, data):
+        # Prosthetei ta bytes pou hrthan kai epistrefei ola ta plhrh frames
+        self.buf += data
+        frames = []
+        pos = 0
+        while True:
+            length = 0
+            shift = 0
+            i = pos
+            while i < len(self.buf):
+                b = self.buf[i]
+                length |= (b & 0x7f) << shift
+                i += 1
+                if not b & 0x80:
+                    break
+                shift += 7
+                if shift > 28:
+                    raise ValueError("bad frame length")
+            else:
+                break  # to varint den exei ftasei oloklhro
+            if length > self.max_frame:
+                raise ValueError(f"frame too large ({length} bytes)")
+            if i + length > len(self.buf):
+                break
+            frames.append(bytes(self.buf[i:i + length]))
+            pos = i + length
+        del self.buf[:pos]
+        return frames
+
+
+class RawReader:
+    # Peer xwris framing (prin apo to frame_length): kathe recv einai ena mhnyma
+    def feed(self, data):
+        return [bytes(data)]
+
+
+def stream_reader(data):
+    # To prwto recv tou geitona deixnei pws einai ta mhnymata tou: me to tag
+    # tou frame_length mprosta, to handshake kai ola ta epomena einai frames.
+    # Epistrefei to reader kai ta mhnymata pou periexei hdh to recv.
+    if data[:1] == HANDSHAKE:
+        reader = FrameReader()
+        return reader, reader.feed(data[1:])
+    reader = RawReader()
+    return reader, reader.feed(data)
+
+
+def next_frame(reader, pending, data=b''):
+    # To epomeno frame apo to pending, afou perasoun ta nea bytes (data) apo
+    # to reader. None an den exei oloklhrwthei akoma kanena. Ta epipleon frames
+    # pou hrthan sto idio recv menoun sto pending gia ton epomeno anagnwsth.
+    if data:
+        pending.extend(reader.feed(data))
+    return pending.pop(0) if pending else None
+
+
+def read_frame(conn, reader, pending):
+    # Blocking anagnwsh enos frame apo socket (to AsyncRouter kanei to idio me await)
+    frame = next_frame(reader, pending)
+    while frame is None:
+        data = conn.recv(4096)
+        if not data:
+            return None
+        frame = next_frame(reader, pending, data)
+    return frame
+
+
+def read_handshake(conn):
+    # To handshake tou geitona, to reader gia ta epomena mhnymata tou kai osa
+    # hrthan mazi me to handshake. (None, None, None) an ekleise h syndesh.
+    data = conn.recv(4096)
+    if not data:
+        return None, None, None
+    reader, pending = stream_reader(data)
+    return read_frame(conn, reader, pending), reader, pending
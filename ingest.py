@@ -0,0 +1,165 @@
+import array
+import multiprocessing
+import signal
+import socket
+import struct
+from multiprocessing.connection import wait
+
+import dv_pb2
+from log import log
+from updates import decode_routes
+
+# Proairetiko receive stage se polla processes: kathe worker exei diko tou UDP
+# socket sto idio port (SO_REUSEPORT) kai kanei ekei to parsing tou DVMessage,
+# to decode twn routes kai ton elegxo seq/fragment. Sto kyrio process ftanoun
+# mono compact records (kleidia kai metrics se arrays) se batches, panw apo
+# ena pipe ana worker. To kernel moirazei ta datagrams ana roh (IP/port
+# apostolea), opote ola ta datagrams enos geitona pane ston idio worker.
+
+BATCH = struct.Struct('<IIII')      # datagrams, bytes, errors, stale
+RECORD = struct.Struct('<QIIBBI')   # seq, fragment, fragment_count, delta, mhkos onomatos, plithos routes
+MAX_BATCH = 64                      # datagrams ana batch pros to kyrio process
+MAX_FLOWS = 1024
+
+
+class SeqFilter:
+    # O idios elegxos me to process_dv_update (palio seq h fragment pou
+    # exoume hdh dei), ana roh (router_id, dieythynsh apostolea). Enas geitonas
+    # pou kanei restart stelnei apo neo socket, ara ksekinaei nea roh.
+    def __init__(self):
+        self.flows = {}
+
+    def accept(self, flow, seq, fragment):
+        state = self.flows.get(flow)
+        if state is None or seq > state[0]:
+            if state is None and len(self.flows) >= MAX_FLOWS:
+                del self.flows[next(iter(self.flows))]
+            self.flows[flow] = (seq, {fragment})
+            return True
+        last_seq, seen = state
+        if seq < last_seq or fragment in seen:
+            return False
+        seen.add(fragment)
+        return True
+
+
+def encode_record(router_id, seq, fragment, fragment_count, delta, routes):
+    name = router_id.encode()
+    keys = array.array('Q', [key for key, _ in routes])
+    # Metric >= 16 einai unreachable: kovoume sto 255 gia na xwraei se byte
+    metrics = bytes(min(metric, 255) for _, metric in routes)
+    return (RECORD.pack(seq, fragment, fragment_count, delta, len(name), len(routes))
+            + name + keys.tobytes() + metrics)
+
+
+def decode_batch(data):
+    # Epistrefei ((datagrams, bytes, errors, stale), [(router_id, routes, seq, fragment, fragment_count, delta)])
+    counts = BATCH.unpack_from(data, 0)
+    records = []
+    view = memoryview(data)
+    offset = BATCH.size
+    while offset < len(data):
+        seq, fragment, fragment_count, delta, name_len, count = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        name = str(view[offset:offset + name_len], 'utf-8')
+        offset += name_len
+        keys = array.array('Q')
+        keys.frombytes(view[offset:offset + 8 * count])
+        offset += 8 * count
+        metrics = view[offset:offset + count]
+        offset += count
+        records.append((name, list(zip(keys.tolist(), metrics.tolist())), seq, fragment, fragment_count, bool(delta)))
+    return counts, records
+
+
+def worker(port, rcvbuf, conn):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.bind(('0.0.0.0', port))
+    seqs = SeqFilter()
+    # To Ctrl-C ftanei se olo to process group: ton worker ton stamataei to
+    # kyrio process (IngestPool.close)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        conn.send_bytes(b'')   # etoimos
+        while True:
+            # Perimenoume to prwto datagram kai meta mazeuoume osa exoun hdh ftasei
+            sock.setblocking(True)
+            data, addr = sock.recvfrom(65535)
+            sock.setblocking(False)
+            counts = [0, 0, 0, 0]
+            records = []
+            while True:
+                counts[0] += 1
+                counts[1] += len(data)
+                try:
+                    msg = dv_pb2.DVMessage()
+                    msg.ParseFromString(data)
+                    h = msg.header
+                    if seqs.accept((h.router_id, addr), h.seq, h.fragment):
+                        records.append(encode_record(h.router_id, h.seq, h.fragment, h.fragment_count,
+                                                     h.delta, decode_routes(msg)))
+                    else:
+                        counts[3] += 1
+                except Exception:
+                    counts[2] += 1
+                if counts[0] >= MAX_BATCH:
+                    break
+                try:
+                    data, addr = sock.recvfrom(65535)
+                except BlockingIOError:
+                    break
+            conn.send_bytes(BATCH.pack(*counts) + b''.join(records))
+    except (OSError, EOFError):
+        # To kyrio process termatise (to pipe ekleise)
+        pass
+
+
+class IngestPool:
+    def __init__(self, port, workers, rcvbuf):
+        # spawn: to kyrio process exei hdh threads, ena fork tha antegrafe kai ta locks tous
+        ctx = multiprocessing.get_context('spawn')
+        self.conns = []
+        self.procs = []
+        for i in range(workers):
+            reader, writer = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=worker, args=(port, rcvbuf, writer), name=f'dv-rx-{i}', daemon=True)
+            proc.start()
+            writer.close()
+            self.conns.append(reader)
+            self.procs.append(proc)
+
+    def wait_ready(self, timeout=10):
+        # Kathe worker stelnei ena keno mhnyma molis kanei bind
+        for conn in self.conns:
+            if not conn.poll(timeout):
+                raise RuntimeError("receive worker did not start")
+            conn.recv_bytes()
+
+    def alive(self):
+        return sum(1 for proc in self.procs if proc.is_alive())
+
+    def receive(self, conn):
+        # Ena batch apo ena worker, h None an o worker termatise
+        try:
+            return conn.recv_bytes()
+        except (EOFError, OSError):
+            if conn in self.conns:
+                self.conns.remove(conn)
+                log.error('UDP', "Receive worker exited, {workers} left", workers=len(self.conns))
+            return None
+
+    def batches(self):
+        while self.conns:
+            for conn in wait(self.conns):
+                data = self.receive(conn)
+                if data is not None:
+                    yield data
+
+    def close(self):
+        self.conns = []
+        for proc in self.procs:
+            proc.terminate()
+        for proc in self.procs:
+            proc.join(1)
@@ -0,0 +1,123 @@
+import random
+import select
+import socket
+import threading
+import time
+
+import dv_pb2
+from log import log
+
+# Grhgorh anixneush aposyndeshs geitona (BFD-style), proairetikh.
+# Kathe router stelnei ena mikro UDP heartbeat se kathe geitona ana interval
+# kai thewrei ton geitona dead an den akousei tipota gia interval * multiplier.
+# To paketo einai ena HelloMessage pou kwdikopoieitai mia fora. O paralhpths
+# den to kanei kan parse: ton geitona ton vriskei apo th dieythynsh (ip, port).
+
+
+class LivenessSession:
+    __slots__ = ('name', 'addr', 'last_rx', 'up')
+
+    def __init__(self, name, addr):
+        self.name = name
+        self.addr = addr
+        self.last_rx = None
+        self.up = False
+
+
+class LivenessManager:
+    def __init__(self, router_name, port, interval=0.05, multiplier=3, on_down=None):
+        self.port = port
+        self.interval = interval
+        self.multiplier = multiplier
+        self.on_down = on_down
+
+        hello = dv_pb2.HelloMessage()
+        hello.header.router_id = router_name
+        self.packet = hello.SerializeToString()
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('0.0.0.0', port))
+        self.sock.setblocking(False)
+
+        self.sessions = {}   # (ip, port) -> LivenessSession
+        self.by_name = {}    # neighbor name -> (ip, port)
+        self.lock = threading.Lock()
+
+        self.sent = 0
+        self.received = 0
+        self.downs = 0
+
+    def add(self, name, ip, port):
+        with self.lock:
+            old = self.by_name.pop(name, None)
+            if old is not None:
+                self.sessions.pop(old, None)
+            addr = (ip, port)
+            self.sessions[addr] = LivenessSession(name, addr)
+            self.by_name[name] = addr
+
+    def remove(self, name):
+        with self.lock:
+            addr = self.by_name.pop(name, None)
+            if addr is not None:
+                self.sessions.pop(addr, None)
+
+    def receive(self, now):
+        while True:
+            try:
+                _, addr = self.sock.recvfrom(512)
+            except BlockingIOError:
+                return
+            except OSError:
+                # px. ICMP port unreachable apo geitona pou den trexei liveness
+                continue
+            self.received += 1
+            session = self.sessions.get(addr)
+            if session is not None:
+                session.last_rx = now
+                session.up = True
+
+    def transmit(self):
+        with self.lock:
+            addrs = list(self.sessions)
+        for addr in addrs:
+            try:
+                self.sock.sendto(self.packet, addr)
+                self.sent += 1
+            except OSError:
+                pass
+
+    def check(self, now):
+        # Mono sessions pou exoun anevei (lavame estw ena paketo) mporoun na pesoun
+        detect = self.interval * self.multiplier
+        down = []
+        with self.lock:
+            for addr, session in list(self.sessions.items()):
+                if session.up and now - session.last_rx > detect:
+                    down.append(session.name)
+                    del self.sessions[addr]
+                    self.by_name.pop(session.name, None)
+        return down
+
+    def run(self):
+        next_tx = time.time()
+        while True:
+            timeout = max(0.0, next_tx - time.time())
+            ready, _, _ = select.select([self.sock], [], [], timeout)
+            now = time.time()
+            if ready:
+                self.receive(now)
+            if now >= next_tx:
+                self.transmit()
+                # Jitter opws sto BFD (75-100% tou interval) gia na mhn sygxronizontai
+                next_tx = now + self.interval * random.uniform(0.75, 1.0)
+            for name in self.check(now):
+                self.downs += 1
+                log.warn('Liveness', "Session to {neighbor} down (no heartbeat for {timeout_ms:.0f} ms)",
+                         neighbor=name, timeout_ms=self.interval * self.multiplier * 1000)
+                if self.on_down:
+                    self.on_down(name)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
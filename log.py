@@ -0,0 +1,142 @@
+import atexit
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+# Logging xwris I/O sta hot paths. Ena log call (akoma kai me to self.lock
+# kratimeno) kanei mono elegxo epipedou kai rate limit kai vazei ena tuple se
+# mia oura. To format kai to grapsimo (stdout h arxeio, keimeno h JSON lines)
+# ta kanei ena background thread, se batches kathe flush_interval.
+# Prin to start() (px. ston simulator) ta records grafontai amesws.
+
+DEBUG, INFO, WARN, ERROR, OFF = 10, 20, 30, 40, 100
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warn': WARN, 'error': ERROR, 'off': OFF}
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', WARN: 'warn', ERROR: 'error'}
+
+
+class Logger:
+    def __init__(self, level=INFO, stream=None, json_lines=False, flush_interval=0.05, capacity=100000):
+        self.level = level
+        self.stream = stream          # None: to trexon sys.stdout
+        self.json_lines = json_lines
+        self.flush_interval = flush_interval
+        self.capacity = capacity
+
+        self.pending = deque()        # (ts, level, tag, fmt, fields, suppressed)
+        self.started = False
+        self.write_lock = threading.Lock()
+        # Rate limit ana kathgoria (tag): token bucket [rate, burst, tokens, last, suppressed]
+        self.buckets = {}
+
+        self.records = 0              # posa records grafthikan
+        self.suppressed = 0           # posa kopike to rate limit
+        self.dropped = 0              # posa xathikan epeidh gemise h oura
+
+    def configure(self, level=None, stream=None, json_lines=None):
+        if level is not None:
+            self.level = LEVELS[level] if isinstance(level, str) else level
+        if stream is not None:
+            self.stream = stream
+        if json_lines is not None:
+            self.json_lines = json_lines
+
+    def limit(self, tag, rate, burst):
+        # To polu `rate` records/sec gia to tag, me bursts mexri `burst`
+        self.buckets[tag] = [rate, burst, burst, time.monotonic(), 0]
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def log(self, level, tag, fmt, **fields):
+        if level < self.level:
+            return
+        suppressed = 0
+        bucket = self.buckets.get(tag)
+        if bucket is not None:
+            # Den pairnoume lock: se race xanetai to polu ena token h ena count
+            now = time.monotonic()
+            bucket[2] = min(bucket[1], bucket[2] + (now - bucket[3]) * bucket[0])
+            bucket[3] = now
+            if bucket[2] < 1:
+                bucket[4] += 1
+                self.suppressed += 1
+                return
+            bucket[2] -= 1
+            suppressed, bucket[4] = bucket[4], 0
+        record = (time.time(), level, tag, fmt, fields, suppressed)
+        if not self.started:
+            self.write([record])
+            return
+        if len(self.pending) >= self.capacity:
+            self.dropped += 1
+            return
+        self.pending.append(record)
+
+    def debug(self, tag, fmt, **fields):
+        self.log(DEBUG, tag, fmt, **fields)
+
+    def info(self, tag, fmt, **fields):
+        self.log(INFO, tag, fmt, **fields)
+
+    def warn(self, tag, fmt, **fields):
+        self.log(WARN, tag, fmt, **fields)
+
+    def error(self, tag, fmt, **fields):
+        self.log(ERROR, tag, fmt, **fields)
+
+    def format(self, record):
+        ts, level, tag, fmt, fields, suppressed = record
+        try:
+            message = fmt.format(**fields)
+        except Exception:
+            message = fmt
+        if self.json_lines:
+            out = {'ts': round(ts, 3), 'level': LEVEL_NAMES.get(level, level), 'tag': tag, 'msg': message}
+            out.update(fields)
+            if suppressed:
+                out['suppressed'] = suppressed
+            return json.dumps(out, default=str) + "\n"
+        mark = "[!] " if level >= WARN else ""
+        line = f"[{time.strftime('%H:%M:%S', time.localtime(ts))}] {mark}[{tag}] {message}"
+        if suppressed:
+            line += f" ({suppressed} similar messages suppressed)"
+        return line + "\n"
+
+    def write(self, records):
+        # Ena write (kai flush) ana batch
+        text = ''.join(self.format(record) for record in records)
+        with self.write_lock:
+            self.records += len(records)
+            try:
+                stream = self.stream or sys.stdout
+                stream.write(text)
+                stream.flush()
+            except Exception: pass
+
+    def flush(self):
+        records = []
+        while self.pending:
+            records.append(self.pending.popleft())
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            records.append((time.time(), WARN, 'Log', "Dropped {dropped} records (queue full)", {'dropped': dropped}, 0))
+        if records:
+            self.write(records)
+
+    def run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def start(self):
+        if self.started:
+            return
+        self.started = True
+        atexit.register(self.flush)
+        threading.Thread(target=self.run, daemon=True).start()
+
+
+# O logger ths diergasias (opws to print, koinos gia ola ta modules)
+log = Logger()
@@ -0,0 +1,177 @@
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from log import log
+
+# Metrics tou router se Prometheus text format (exposition format 0.0.4).
+# Sto hot path ena metric einai mia prosthesh se int (Counter) h ena bisect kai
+# mia prosthesh (Histogram), xwris lock: oi enhmerwseis ginontai apo ligous
+# threads kai to GIL, kai ena xameno increment se race den allazei tipota.
+# Osa yparxoun hdh allou (megethos table, geitones, FIB, scheduler) ta
+# diavazoun callbacks mono otan zhththoun ta metrics.
+
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ','.join(f'{k}="{str(v)}"' for k, v in sorted(labels.items()))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.labels = labels
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # to teleutaio einai to +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield self.name + '_bucket', dict(self.labels, le=repr(bound)), total
+        total += self.counts[-1]
+        yield self.name + '_bucket', dict(self.labels, le='+Inf'), total
+        yield self.name + '_sum', self.labels, self.sum
+        yield self.name + '_count', self.labels, total
+
+
+class Callback:
+    # Timh pou ypologizetai sto scrape: to fn epistrefei enan arithmo h
+    # mia lista apo (labels, timh)
+    def __init__(self, name, kind, fn):
+        self.name = name
+        self.kind = kind
+        self.fn = fn
+
+    def samples(self):
+        value = self.fn()
+        if isinstance(value, (int, float)):
+            yield self.name, {}, value
+            return
+        for labels, v in value:
+            yield self.name, labels, v
+
+
+class TimedLock:
+    # threading.Lock pou metraei poso perimenei kathe thread na to parei
+    # kai poso to kratane (gia to self.lock tou router)
+    def __init__(self, wait, hold):
+        self.lock = threading.Lock()
+        self.wait = wait
+        self.hold = hold
+        self.acquired_at = 0.0
+
+    def acquire(self):
+        start = time.perf_counter()
+        self.lock.acquire()
+        self.acquired_at = now = time.perf_counter()
+        self.wait.observe(now - start)
+        return True
+
+    def release(self):
+        self.hold.observe(time.perf_counter() - self.acquired_at)
+        self.lock.release()
+
+    def locked(self):
+        return self.lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class Registry:
+    def __init__(self, namespace='dv'):
+        self.namespace = namespace
+        self.families = {}    # onoma -> [kind, help, [metrics]]
+        self.errors = {}      # onoma -> poses fores apetyxe to callback tou
+
+    def add(self, name, help_text, metric):
+        family = self.families.setdefault(metric.name, [metric.kind, help_text, []])
+        family[2].append(metric)
+        return metric
+
+    def counter(self, name, help_text, **labels):
+        return self.add(name, help_text, Counter(f"{self.namespace}_{name}", labels))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS, **labels):
+        return self.add(name, help_text, Histogram(f"{self.namespace}_{name}", labels, buckets))
+
+    def gauge_fn(self, name, help_text, fn):
+        return self.add(name, help_text, Callback(f"{self.namespace}_{name}", 'gauge', fn))
+
+    def counter_fn(self, name, help_text, fn):
+        return self.add(name, help_text, Callback(f"{self.namespace}_{name}", 'counter', fn))
+
+    def render(self):
+        lines = []
+        for name, (kind, help_text, metrics) in self.families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for metric in metrics:
+                try:
+                    lines.extend([f"{sample}{format_labels(labels)} {value}" for sample, labels, value in metric.samples()])
+                except Exception as e:
+                    # To family menei xwris times: to lathos fainetai sto log kai
+                    # sto scrape_errors_total, oxi san siwphlh apousia
+                    self.errors[name] = self.errors.get(name, 0) + 1
+                    log.error('Metrics', "Cannot collect {family}: {error}", family=name, error=e)
+        if self.errors:
+            name = f"{self.namespace}_scrape_errors_total"
+            lines.append(f"# HELP {name} Metric families whose values could not be collected")
+            lines.append(f"# TYPE {name} counter")
+            for family, count in sorted(self.errors.items()):
+                lines.append(f"{name}{format_labels({'family': family})} {count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, addr='127.0.0.1'):
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((addr, int(port)), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
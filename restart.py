@@ -0,0 +1,75 @@
+import os
+import struct
+
+# Graceful restart: to routing table grafetai periodika se ena mikro binary
+# arxeio kai ksanadiavazetai sthn ekkinhsh, wste o router na synexizei na
+# diafhmizei ta idia routes (kai na krataei ta idia kernel routes) oso oi
+# geitones tou ta epivevaiwnoun, anti na ta ksanamathei apo to mhden.
+#
+# Format (big endian):
+#   header:  b'DVRS', version (u8), saved_at (f64, epoch sec)
+#   onomata: plithos (u16), kathe onoma len (u8) + utf-8
+#   routes:  plithos (u32), kathe route addr (u32), plen (u8), metric (u8),
+#            plithos next hops (u8) kai ta indexes tous sta onomata (u16 to kathe)
+
+MAGIC = b'DVRS'
+VERSION = 1
+HEADER = struct.Struct('>4sBd')
+ROUTE = struct.Struct('>IBBB')
+
+
+def save_snapshot(path, routes, saved_at):
+    # routes: (kleidi tou route_table, next hops (tuple), metric)
+    names = {}
+    body = bytearray()
+    count = 0
+    for key, hops, metric in routes:
+        body += ROUTE.pack(key >> 6, key & 63, metric, len(hops))
+        for hop in hops:
+            body += struct.pack('>H', names.setdefault(hop, len(names)))
+        count += 1
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, saved_at))
+    out += struct.pack('>H', len(names))
+    for name in names:
+        raw = name.encode()
+        out += struct.pack('>B', len(raw)) + raw
+    out += struct.pack('>I', count) + body
+
+    # Grafoume se proswrino arxeio kai to metonomazoume: ena crash sth mesh
+    # tou save den afhnei miso snapshot
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(out)
+    os.replace(tmp, path)
+    return count
+
+
+def load_snapshot(path):
+    # Epistrefei (saved_at, [(kleidi, next hops, metric)]) h None
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, saved_at = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            return None
+        offset = HEADER.size
+        (name_count,) = struct.unpack_from('>H', data, offset)
+        offset += 2
+        names = []
+        for _ in range(name_count):
+            length = data[offset]
+            names.append(data[offset + 1:offset + 1 + length].decode())
+            offset += 1 + length
+        (count,) = struct.unpack_from('>I', data, offset)
+        offset += 4
+        routes = []
+        for _ in range(count):
+            addr, plen, metric, hop_count = ROUTE.unpack_from(data, offset)
+            offset += ROUTE.size
+            hops = struct.unpack_from(f'>{hop_count}H', data, offset)
+            offset += 2 * hop_count
+            routes.append((addr << 6 | plen, tuple(names[i] for i in hops), metric))
+        return saved_at, routes
+    except (OSError, struct.error, IndexError, UnicodeDecodeError):
+        return None
@@ -0,0 +1,159 @@
+import socket
+import sys
+
+# Compact routing table. Ta prefixes kratiountai san ena int kleidi
+# (network << 6 | prefix_len) anti gia string CIDR, kai ta entries einai
+# __slots__ objects anti gia dict, me interned onomata next-hop.
+# Longest-prefix-match: to idio to dict einai to index. Gia mia dieythynsh
+# dokimazoume ta mhkh prefix pou yparxoun sto table, apo to megalytero pros
+# to mikrotero, me mask kai ena dict lookup to kathe ena (to polu 33).
+
+MASKS = [(0xffffffff << (32 - plen)) & 0xffffffff for plen in range(33)]
+
+
+def prefix_key(prefix):
+    net, _, plen = prefix.partition('/')
+    plen = int(plen) if plen else 32
+    addr = int.from_bytes(socket.inet_aton(net), 'big') & MASKS[plen]
+    return addr << 6 | plen
+
+
+def key_prefix(key):
+    return f"{socket.inet_ntoa((key >> 6).to_bytes(4, 'big'))}/{key & 63}"
+
+
+def address_int(address):
+    return int.from_bytes(socket.inet_aton(address), 'big')
+
+
+class RouteEntry:
+    # next_hops: se ECMP, ola ta isodynama next hops (taksinomhmeno tuple, >= 2).
+    # Alliws None kai isxyei mono to next_hop.
+    __slots__ = ('next_hop', 'metric', 'timestamp', 'gen', 'next_hops')
+
+    def __init__(self, next_hop, metric, timestamp, gen=0):
+        self.next_hop = sys.intern(next_hop)
+        self.metric = metric
+        self.timestamp = timestamp
+        self.gen = gen
+        self.next_hops = None
+
+    def update(self, next_hop, metric, timestamp):
+        self.next_hop = sys.intern(next_hop)
+        self.metric = metric
+        self.timestamp = timestamp
+        self.next_hops = None
+
+    def hops(self):
+        return self.next_hops or (self.next_hop,)
+
+    def via(self):
+        # To kleidi ths omadas sta advertisements: onoma h tuple se ECMP
+        return self.next_hops or self.next_hop
+
+    def add_hop(self, next_hop):
+        self.next_hops = tuple(sorted(set(self.hops()) | {sys.intern(next_hop)}))
+
+    def remove_hop(self, next_hop):
+        # Vgazei ena apo ta ECMP next hops. Epistrefei False an htan to monadiko.
+        if self.next_hops is None:
+            return False
+        hops = tuple(h for h in self.next_hops if h != next_hop)
+        if self.next_hop == next_hop:
+            self.next_hop = hops[0]
+        self.next_hops = hops if len(hops) > 1 else None
+        return True
+
+
+class TableSnapshot:
+    # Ametavlhto stigmiotypo tou table se ena version: kleidi -> (via, metric).
+    # Meta th dhmosieush den allazei pote, opote diavazetai apo opoiodhpote
+    # thread xwris lock. To epomeno ftiaxnetai san antigrafo pou allazei mono
+    # ta kleidia pou allaksan (copy-on-write).
+    __slots__ = ('version', 'routes')
+
+    def __init__(self, version, routes):
+        self.version = version
+        self.routes = routes
+
+    def __len__(self):
+        return len(self.routes)
+
+    def advance(self, version, changed):
+        # changed: (kleidi, via, metric), me via None gia ta routes pou diagrafhkan
+        routes = dict(self.routes)
+        for key, via, metric in changed:
+            if via is None:
+                routes.pop(key, None)
+            else:
+                routes[key] = (via, metric)
+        return TableSnapshot(version, routes)
+
+
+class RouteTable:
+    def __init__(self):
+        self.routes = {}                # key -> RouteEntry
+        self.length_counts = [0] * 33   # posa prefixes exei kathe mhkos
+        self.lengths = []               # ta mhkh pou yparxoun, fthinousa seira
+
+    def __len__(self):
+        return len(self.routes)
+
+    def __contains__(self, prefix):
+        return prefix_key(prefix) in self.routes
+
+    def __iter__(self):
+        for key in self.routes:
+            yield key_prefix(key)
+
+    def __getitem__(self, prefix):
+        return self.routes[prefix_key(prefix)]
+
+    def __delitem__(self, prefix):
+        self.delete_key(prefix_key(prefix))
+
+    def get(self, prefix):
+        return self.routes.get(prefix_key(prefix))
+
+    def set(self, prefix, next_hop, metric, timestamp):
+        return self.set_key(prefix_key(prefix), next_hop, metric, timestamp)
+
+    # Ta idia me kleidi anti gia string, gia to receive path kai ta v2 updates
+    def get_key(self, key):
+        return self.routes.get(key)
+
+    def set_key(self, key, next_hop, metric, timestamp):
+        entry = RouteEntry(next_hop, metric, timestamp)
+        if key not in self.routes:
+            self._count(key & 63, 1)
+        self.routes[key] = entry
+        return entry
+
+    def delete_key(self, key):
+        del self.routes[key]
+        self._count(key & 63, -1)
+
+    def clear(self):
+        self.routes.clear()
+        self.length_counts = [0] * 33
+        self.lengths = []
+
+    def items(self):
+        for key, entry in self.routes.items():
+            yield key_prefix(key), entry
+
+    def _count(self, plen, delta):
+        self.length_counts[plen] += delta
+        if self.length_counts[plen] in (0, 1):
+            self.lengths = [l for l in range(32, -1, -1) if self.length_counts[l]]
+
+    def lookup(self, address):
+        # Longest-prefix-match: epistrefei (prefix, entry) h None
+        addr = address_int(address) if isinstance(address, str) else address
+        routes = self.routes
+        for plen in self.lengths:
+            key = (addr & MASKS[plen]) << 6 | plen
+            entry = routes.get(key)
+            if entry is not None:
+                return key_prefix(key), entry
+        return None
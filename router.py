@@ -3,359 +3,997 @@ import socket
 import threading
 import time
 import subprocess
+import argparse
+import signal
+from collections import OrderedDict
 import dv_pb2
+from fib import FibManager, make_backend, parse_ip_routes
+from updates import UpdateCache, encode_header, decode_routes
+from scheduler import UpdateScheduler
+from timers import ExpiryQueue
+from framing import FrameReader, encode_frame, encode_handshake, read_handshake
+from liveness import LivenessManager
+from route_table import RouteTable, TableSnapshot, prefix_key, key_prefix
+from summary import Summarizer
+from log import log
+from metrics import Registry, TimedLock
+from restart import save_snapshot, load_snapshot
+from ingest import IngestPool, decode_batch
 
 INFINITY = 16
+IP_UDP_OVERHEAD = 28   # IPv4 (20) + UDP (8) headers
+UDP_RCVBUF = 4 * 1024 * 1024
+HELLO_INTERVAL = 5     # sec metaksy Hello
+UPDATE_INTERVAL = 20   # sec metaksy periodic full updates
+NEIGHBOR_TIMEOUT = 15  # sec xwris Hello prin thewrhthei dead o geitonas
+ROUTE_TIMEOUT = 60     # sec xwris ananewsh prin diagrafei ena learned route
+WIRE_VERSION = 2       # neotero wire format twn DV updates pou ypostirizoume
+RESTART_TIME = 30      # sec pou oi geitones kratane ta routes mas oso kanoume restart
+SNAPSHOT_INTERVAL = 20 # sec metaksy snapshots tou table sto restart file
+CONNECT_RETRY_MIN = 0.2  # sec, diplasiazetai se kathe apotyxhmeno connect
+CONNECT_RETRY_MAX = 5.0
+HANDSHAKE_TIMEOUT = 5.0 # sec gia to ConnParamMessage tou geitona
+EARLY_WINDOW = 2.0     # sec pou kratame updates apo geitona prin teleiwsei to handshake
+EARLY_FRAGMENTS = 1024 # megisto plithos tetoiwn fragments ana geitona
+LOG_RATE = 20          # records/sec ana kathgoria gia ta mhnymata ana route / paketo
+LOG_BURST = 200
+
+# Se megala tables kathe allagh topologias vgazei ena mhnyma ana route:
+# to log ta kovei kai grafei posa paralhfthikan
+for tag in ('New Route', 'Better Path', 'Route Dead', 'Route Adj', 'ECMP', 'Timeout',
+            'UDP-Recv', 'UDP', 'Hello', 'TRIGGERED', 'Kernel'):
+    log.limit(tag, LOG_RATE, LOG_BURST)
 
 class Router:
-    def __init__(self, router_name, tcp_port, udp_port, neighbors):
+    def __init__(self, router_name, tcp_port, udp_port, neighbors, fib_backend='batch', mtu=1500,
+                 hold_min=1.0, hold_max=5.0, neighbor_interval=1.0,
+                 liveness_port=0, liveness_interval=0.05, liveness_multiplier=3,
+                 summarize=None, wire_version=WIRE_VERSION, ecmp=False, dump_interval=0,
+                 metrics_port=0, metrics_addr='127.0.0.1', restart_file=None, restart_time=RESTART_TIME,
+                 rx_workers=0, clock=time.time, transport=None):
         self.router_name = router_name
+        # To clock kai to transport (UDP socket) mporoun na antikatastathoun,
+        # px. apo to simulator.py me virtual xrono kai virtual diktyo
+        self.clock = clock
         
         self.tcp_port = int(tcp_port)
         self.udp_port = int(udp_port)
         self.neighbors = neighbors 
         self.seq_no = 0
+        # Kathe DV datagram prepei na xwraei sto path MTU gia na mhn ginei IP fragmentation
+        self.max_payload = int(mtu) - IP_UDP_OVERHEAD
+        # To wire format synomologeitai ana geitona sto handshake (o palios peer milaei v1)
+        self.wire_version = int(wire_version)
+        # ECMP: krataei ola ta isodynama next hops ana prefix (multipath route sto kernel)
+        self.ecmp = ecmp
+        # Kathe posa sec grafetai to routing table sto log (0: pote). Meta to
+        # prwto dump grafontai mono ta entries pou allaksan apo to prohgoumeno dump.
+        self.dump_interval = int(dump_interval)
+        self.dumped = None
+        # Metrics (counters/histograms) metrountai panta, to HTTP endpoint einai proairetiko
+        self.metrics = Registry()
+        self.metrics_port = int(metrics_port)
+        self.metrics_addr = metrics_addr
+        # Graceful restart: to table sozetai sto restart_file kai fortwnetai sthn
+        # ekkinhsh. Ta restored routes menoun mexri na ta epivevaiwsei o next hop
+        # tous h na lhksei to restart_time. Oi geitones kratane ta routes mas oso
+        # leipoume (restart_time sto handshake).
+        self.restart_file = restart_file
+        self.restart_time = int(restart_time) if restart_file else 0
+        self.restored = set()
+        self.restart_deadline = None
+        self.saved_version = None
+        self.kernel_routes = {}     # kleidi -> gateways twn routes pou vrhkame sto kernel
+        self.restarting = {}        # geitonas pou kanei restart -> deadline
+        self.connecting = set()     # IPs geitonwn me connect se exelixh (me to neighbor_lock)
+        self.udp_ready = threading.Event()
+        # To run() epistrefei (kai grafei to restart file) otan ginei set, px. apo SIGTERM
+        self.stopping = threading.Event()
+        # Proairetika, to parsing kai to decode twn DV updates ginetai se
+        # rx_workers processes (ingest.py) anti gia to UDP thread
+        self.rx_workers = int(rx_workers)
+        self.ingest = None
+        # O geitonas stelnei to table tou amesws meta to handshake kai mporei na
+        # ftasei prin to add_neighbor edw: to kratame kai to efarmozoume meta
+        self.early_updates = {}
 
-        print(f"[{time.strftime('%H:%M:%S')}] [Init] Router Started: Name='{self.router_name}'")
+        log.info('Init', "Router Started: Name='{name}'", name=self.router_name)
 
         # Edw apothikeuoume tous energous geitones (TCP connections, IPs, klp)
         self.active_neighbors = {}
         
         # O pinakas dromologhshs (Routing Table)
-        self.routing_table = {}
-        self.lock = threading.Lock()
+        self.routing_table = RouteTable()
+        # Auksanetai se kathe allagh tou table pou allazei ta advertisements.
+        # To changes krataei prefix -> gen me seira allaghs, gia ta delta updates.
+        self.table_version = 0
+        self.changes = OrderedDict()
+        # Ta senders, to dump kai to restart file diavazoun to table apo to
+        # teleutaio dhmosieumeno TableSnapshot, xwris to self.lock
+        self.published = TableSnapshot(0, {})
+        self.publish_lock = threading.Lock()
+
+        # Dyo locks, panta me th seira self.lock -> self.neighbor_lock:
+        #  self.lock: to table, changes/table_version, seq_no kai ta pedia twn
+        #    geitonwn pou aforoun ta updates (last_seq, fragments, adv_gen)
+        #  self.neighbor_lock: ta Hello (last_hello) kai ta neighbor_timers.
+        # To active_neighbors allazei (prosthikh/afairesh) kratwntas kai ta dyo,
+        # opote arkei opoiodhpote apo ta dyo gia na to diavaseis.
+        self.lock = self.timed_lock('table')
+        self.neighbor_lock = self.timed_lock('neighbors')
+        # Ta send rounds (send_dv_updates) trexoun ena ena, me th seira tou seq
+        # tous. Pairnetai prin apo ola ta alla locks.
+        self.send_lock = self.timed_lock('send')
+
+        # Deadlines gia geitones kai learned routes: o garbage collector
+        # koitaei mono osa ftanoun sth lhksh tous (ta topika routes den mpainoun)
+        self.neighbor_timers = ExpiryQueue(NEIGHBOR_TIMEOUT)
+        self.route_timers = ExpiryQueue(ROUTE_TIMEOUT)
+
+        # Ta updates kwdikopoiountai mia fora ana table_version kai stelnontai
+        # apo ena monimo UDP socket
+        self.update_cache = UpdateCache(self.route_budget(), INFINITY)
+        # Proairetiko summarization twn advertisements mesa sta boundaries
+        self.summarizer = Summarizer(summarize, INFINITY) if summarize else None
+        self.send_sock = transport or socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        # Ena thread gia ola ta triggered updates anti gia ena thread ana allagh
+        self.scheduler = UpdateScheduler(lambda: self.send_dv_updates(triggered=True),
+                                         hold_min, hold_max, neighbor_interval, clock=clock)
+
+        # To FIB programmatizei to kernel se batches apo diko tou thread
+        self.fib = FibManager(make_backend(fib_backend))
+
+        # Proairetiko grhgoro liveness (BFD-style) ana geitona panw apo UDP
+        self.liveness = None
+        if liveness_port:
+            self.liveness = LivenessManager(self.router_name, int(liveness_port), liveness_interval,
+                                            liveness_multiplier, on_down=self.remove_neighbor)
         
+        self.init_metrics()
         self.init_local_routes()
-        
+        if self.restart_file:
+            self.restore()
+        self.adopt_kernel_routes()
+
+    def timed_lock(self, name):
+        return TimedLock(self.metrics.histogram('lock_wait_seconds', "Time spent waiting for a router lock", lock=name),
+                         self.metrics.histogram('lock_hold_seconds', "Time a router lock was held", lock=name))
+
+    def init_metrics(self):
+        m = self.metrics
+        self.rx_datagrams = m.counter('rx_datagrams_total', "DV datagrams received")
+        self.rx_bytes = m.counter('rx_bytes_total', "DV datagram bytes received")
+        self.rx_errors = m.counter('rx_errors_total', "DV datagrams that failed to parse or process")
+        self.rx_decode = m.histogram('rx_decode_seconds', "Time to parse and decode one DV datagram")
+        self.rx_full = m.counter('rx_updates_total', "DV update datagrams accepted", kind='full')
+        self.rx_delta = m.counter('rx_updates_total', "DV update datagrams accepted", kind='delta')
+        self.rx_stale = m.counter('rx_stale_total', "DV datagrams dropped as old or duplicate (seq/fragment)")
+        self.rx_routes = m.counter('rx_routes_total', "Routes received in accepted DV updates")
+        self.rx_process = m.histogram('rx_process_seconds', "Time to apply one DV datagram to the table, including lock wait")
+        self.route_changes = m.counter('route_changes_total', "Routing table changes that alter advertisements")
+        self.tx_time = {True: m.histogram('tx_seconds', "Time to build and send one round of DV updates", kind='triggered'),
+                        False: m.histogram('tx_seconds', "Time to build and send one round of DV updates", kind='periodic')}
+        self.tx_datagrams = m.counter('tx_datagrams_total', "DV datagrams sent")
+        self.tx_bytes = m.counter('tx_bytes_total', "DV datagram bytes sent")
+        self.tx_errors = m.counter('tx_errors_total', "DV update sends that failed")
+        self.hellos = m.counter('hellos_received_total', "Hello messages received")
+
+        m.gauge_fn('routes', "Routing table entries by state",
+                   lambda: self.count_routes())
+        m.gauge_fn('table_version', "Current routing table generation", lambda: self.table_version)
+        m.gauge_fn('published_version', "Table generation of the last published snapshot",
+                   lambda: self.published.version)
+        m.gauge_fn('neighbors', "Active neighbors", lambda: len(self.active_neighbors))
+        m.gauge_fn('neighbor_last_seq', "Last accepted DV sequence number per neighbor",
+                   lambda: [({'neighbor': n}, i.get('last_seq', -1)) for n, i in list(self.active_neighbors.items())])
+        m.gauge_fn('neighbor_update_age_seconds', "Seconds since the last accepted DV update per neighbor",
+                   lambda: [({'neighbor': n}, self.clock() - i.get('last_update', i['last_hello']))
+                            for n, i in list(self.active_neighbors.items())])
+        m.gauge_fn('neighbor_hello_age_seconds', "Seconds since the last hello per neighbor",
+                   lambda: [({'neighbor': n}, self.clock() - i['last_hello']) for n, i in list(self.active_neighbors.items())])
+
+        m.counter_fn('scheduler_triggers_total', "Triggered updates requested", lambda: self.scheduler.triggers)
+        m.counter_fn('scheduler_merged_total', "Triggers merged into a pending update", lambda: self.scheduler.merged)
+        m.counter_fn('scheduler_flushes_total', "Triggered update rounds sent", lambda: self.scheduler.flushes)
+        m.counter_fn('scheduler_deferred_total', "Triggered sends delayed by the per-neighbor rate limit",
+                     lambda: self.scheduler.deferred)
+
+        self.fib.on_batch = m.histogram('fib_batch_seconds', "Time to program one batch of kernel routes").observe
+        m.counter_fn('fib_installs_total', "Kernel routes added or replaced", lambda: self.fib.installs)
+        m.counter_fn('fib_removals_total', "Kernel routes removed", lambda: self.fib.removals)
+        m.counter_fn('fib_failures_total', "Kernel route changes that failed", lambda: self.fib.failures)
+        m.counter_fn('fib_batches_total', "Kernel programming batches", lambda: self.fib.batches)
+        m.gauge_fn('fib_routes', "Routes installed in the kernel by this router", lambda: len(self.fib.installed))
+        m.gauge_fn('fib_pending', "Route changes waiting for the next kernel batch", lambda: len(self.fib.dirty))
+
+        m.counter_fn('log_records_total', "Log records written", lambda: log.records)
+        m.counter_fn('log_suppressed_total', "Log records dropped by the per-category rate limit", lambda: log.suppressed)
+        if self.rx_workers:
+            m.gauge_fn('rx_workers', "Receive worker processes alive",
+                       lambda: self.ingest.alive() if self.ingest else 0)
+        if self.liveness:
+            m.counter_fn('liveness_down_total', "Liveness sessions declared down", lambda: self.liveness.downs)
+        if self.summarizer:
+            m.gauge_fn('summary_routes_in', "Table routes before summarization in the last full update",
+                       lambda: self.summarizer.routes_in)
+            m.gauge_fn('summary_routes_out', "Routes advertised after summarization in the last full update",
+                       lambda: self.summarizer.routes_out)
+            m.gauge_fn('summary_compression_ratio', "Table routes per advertised route",
+                       lambda: self.summarizer.ratio())
+
+    def count_routes(self):
+        # Apo to teleutaio dhmosieumeno snapshot: to scrape den pairnei lock
+        routes = self.published.routes
+        reachable = sum(1 for _, metric in routes.values() if metric < INFINITY)
+        return [({'state': 'reachable'}, reachable),
+                ({'state': 'unreachable'}, len(routes) - reachable)]
+
     def init_local_routes(self):
         try:
             # Diavazoume ta routes tou systhmatos (Linux kernel) gia na vroume ta topika diktya
             cmd = "ip route show"
             process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             output, _ = process.communicate()
-            lines = output.decode('utf-8').split('\n')
+            # Ta routes me gateway pou egkathistoume emeis einai proto boot (to
+            # default tou "ip route" kai tou netlink backend). Osa vroume ta afhse
+            # to prohgoumeno process: ta pairnei to adopt_kernel_routes().
+            cmd = "ip route show proto boot"
+            process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            boot, _ = process.communicate()
             with self.lock:
-                for line in lines:
-                    parts = line.split()
-                    if len(parts) > 0:
-                        prefix = parts[0]
-                        if '/' in prefix and 'default' not in prefix:
-                            if prefix.startswith('172.17'): continue 
-                            
-                            # Prosthetoume ta topika diktya me metric 0
-                            self.routing_table[prefix] = {
-                                'next_hop': '-', 
-                                'metric': 0,
-                                'timestamp': time.time()
-                            }
-                            print(f"[{time.strftime('%H:%M:%S')}] [Routes] Added local network: {prefix}")
+                for prefix, gateways in parse_ip_routes(output.decode('utf-8')).items():
+                    if prefix.startswith('172.17') or gateways: continue
+                    # Prosthetoume ta topika diktya me metric 0
+                    key = prefix_key(prefix)
+                    self.mark_changed(key, self.routing_table.set_key(key, '-', 0, self.clock()))
+                    log.info('Routes', "Added local network: {prefix}", prefix=prefix)
+                for prefix, gateways in parse_ip_routes(boot.decode('utf-8')).items():
+                    key = prefix_key(prefix)
+                    if gateways and not prefix.startswith('172.17') and self.routing_table.get_key(key) is None:
+                        self.kernel_routes[key] = gateways
         except Exception as e:
-            print(f"[{time.strftime('%H:%M:%S')}] [!] Error reading system routes: {e}")
+            log.error('Routes', "Error reading system routes: {error}", error=e)
+
+    def restore(self):
+        # Fortwnei to teleutaio snapshot: ta learned routes mpainoun sto table
+        # opws htan kai ta antistoixa kernel routes ypiothetountai xwris reinstall
+        snapshot = load_snapshot(self.restart_file)
+        if snapshot is None:
+            return
+        saved_at, routes = snapshot
+        now = self.clock()
+        if now - saved_at > ROUTE_TIMEOUT:
+            log.info('Restart', "Snapshot {path} is {age:.0f}s old, starting empty", path=self.restart_file, age=now - saved_at)
+            return
 
-    def install_route(self, prefix, next_hop_name):
         with self.lock:
-            if next_hop_name not in self.active_neighbors:
-                return
-            next_hop_ip = self.active_neighbors[next_hop_name]['phys_ip']
-        
+            for key, hops, metric in routes:
+                if self.routing_table.get_key(key) is not None or not hops:
+                    continue
+                entry = self.routing_table.set_key(key, hops[0], metric, now)
+                for hop in hops[1:]:
+                    entry.add_hop(hop)
+                self.mark_changed(key, entry)
+                self.route_timers.schedule(key, now)
+                self.restored.add(key)
+            self.restart_deadline = now + self.restart_time
+        adopted = sum(1 for key in self.restored if key in self.kernel_routes)
+        log.info('Restart', "Restored {routes} routes from {path} (saved {age:.1f}s ago), adopted {adopted} kernel routes",
+                 routes=len(self.restored), path=self.restart_file, age=now - saved_at, adopted=adopted)
+
+    def adopt_kernel_routes(self):
+        # Ola ta kernel routes tou prohgoumenou process mpainoun sto FIB san
+        # egkatesthmena. Ta restored menoun xwris reinstall. Ta ypoloipa (ektos
+        # snapshot, palio h xwris snapshot, xwris restart file) aposyrontai, alliws
+        # tha emenan sto kernel xwris na ta kserei kaneis.
+        stale = 0
+        for key, gateways in self.kernel_routes.items():
+            self.fib.adopt(key_prefix(key), gateways)
+            if key not in self.restored:
+                self.fib.withdraw(key_prefix(key))
+                stale += 1
+        if stale:
+            log.info('Restart', "Withdrawing {routes} kernel routes left by a previous process", routes=stale)
+
+    def save_snapshot(self):
+        snapshot = self.snapshot()
+        if self.saved_version == snapshot.version:
+            return
+        self.saved_version = snapshot.version
+        routes = [(key, via if type(via) is tuple else (via,), metric)
+                  for key, (via, metric) in snapshot.routes.items() if via != '-' and metric < INFINITY]
         try:
-            cmd = f"ip route replace {prefix} via {next_hop_ip}"
-            subprocess.run(cmd, shell=True, check=True, stderr=subprocess.PIPE)
-            print(f"[{time.strftime('%H:%M:%S')}] [Kernel] Installed: {prefix} via {next_hop_ip}")
+            save_snapshot(self.restart_file, routes, self.clock())
         except Exception as e:
-            print(f"[{time.strftime('%H:%M:%S')}] [!] Failed to install route {prefix}: {e}")
+            log.error('Restart', "Cannot write {path}: {error}", path=self.restart_file, error=e)
 
-    def remove_route(self, prefix):
-        try:
-            cmd = f"ip route del {prefix}"
-            subprocess.run(cmd, shell=True, stderr=subprocess.DEVNULL)
-            print(f"[{time.strftime('%H:%M:%S')}] [Kernel] Removed: {prefix}")
-        except:
-            pass  # Το route μπορεί να μην υπάρχει ήδη
+    def restart_synced(self):
+        # Oloi oi geitones ksanasyndethikan kai esteilan olo to table tous
+        with self.neighbor_lock:
+            return (len(self.active_neighbors) >= max(len(self.neighbors), 1)
+                    and all(info.get('synced') for info in self.active_neighbors.values()))
 
-    def send_dv_updates(self, triggered=False):
-        prefix_type = "TRIGGERED" if triggered else "PERIODIC"
-        
+    def reconcile(self, now):
+        # Telos tou restart: osa restored routes den epivevaiwse o next hop tous
+        # ginontai poison, kai ta next hops pou den ksanaemfanisthkan vgainoun
+        changed = 0
         with self.lock:
-            current_table = self.routing_table.copy()
-            targets = []
-            for name, info in self.active_neighbors.items():
-                targets.append((name, info['phys_ip'], info['udp_port']))
-
-            self.seq_no += 1
-            curr_seq = self.seq_no
-
-        for target_name, target_phys_ip, target_port in targets:
-            msg = dv_pb2.DVMessage()
-            msg.header.version = 1
-            msg.header.router_id = self.router_name
-            msg.header.seq = curr_seq
-            msg.header.sent_at_ms = int(time.time() * 1000)
-            
-            count = 0
-            for prefix, entry in current_table.items():
-                r = msg.routes.add()
-                r.prefix = prefix
-                r.next_hop = entry['next_hop']
-                
-                # Efarmogi kanona "Split Horizon with Poison Reverse"
-                # An mathame to route apo ton geitona pou tou stelnoume twra,
-                # tou leme oti to kostos einai apeiro (16) gia na mhn to steilei pisw se emas.
-                if entry['next_hop'] == target_name:
-                    r.metric = INFINITY
+            for key, entry in self.routing_table.routes.items():
+                if entry.next_hop == '-' or entry.metric >= INFINITY:
+                    continue
+                if key not in self.restored:
+                    gone = [hop for hop in entry.hops() if hop not in self.active_neighbors
+                            and hop not in self.restarting]
+                    if not gone:
+                        continue
+                    if len(gone) < len(entry.hops()):
+                        for hop in gone:
+                            entry.remove_hop(hop)
+                        self.mark_changed(key, entry)
+                        self.install_route(key, entry)
+                        changed += 1
+                        continue
+                entry.metric = INFINITY
+                entry.timestamp = now
+                self.mark_changed(key, entry)
+                self.remove_route(key)
+                changed += 1
+            self.restored = set()
+            self.restart_deadline = None
+        log.info('Restart', "Reconciled restored table, withdrew {changed} stale routes", changed=changed)
+        if changed:
+            self.scheduler.trigger()
+
+    def mark_changed(self, key, entry=None):
+        # Kaleitai me to self.lock kratimeno, meta apo kathe allagh enos entry.
+        # Ta prefixes mesa ston router einai kleidia tou route_table (int).
+        self.table_version += 1
+        self.route_changes.inc()
+        self.changes[key] = self.table_version
+        self.changes.move_to_end(key)
+        if entry is None:
+            entry = self.routing_table.get_key(key)
+        if entry is not None:
+            entry.gen = self.table_version
+
+    def changes_since(self, gen, deleted=('-', INFINITY)):
+        # Ta entries pou allaksan meta to gen, me kostos O(allages)
+        changed = []
+        for key in reversed(self.changes):
+            if self.changes[key] <= gen:
+                break
+            entry = self.routing_table.get_key(key)
+            if entry is None:
+                # To route diagrafhke: sta updates to stelnoume ws unreachable
+                changed.append((key,) + deleted)
+            else:
+                changed.append((key, entry.via(), entry.metric))
+        changed.reverse()
+        return changed
+
+    def snapshot(self):
+        # To table sto trexon version san ametavlhto TableSnapshot. Sto
+        # self.lock mazeuoume mono tis allages apo to prohgoumeno snapshot
+        # (O(allages)), to antigrafo ginetai ektos lock. Ena build th fora.
+        published = self.published
+        if published.version == self.table_version:
+            return published
+        with self.publish_lock:
+            published = self.published
+            with self.lock:
+                version = self.table_version
+                if published.version == version:
+                    return published
+                changed = self.changes_since(published.version, deleted=(None, None))
+            self.published = published.advance(version, changed)
+            return self.published
+
+    def install_route(self, key, entry):
+        # Kaleitai me to self.lock hdh kratimeno (apo process_dv_update),
+        # opote den to ksanapairnoume, kai to active_neighbors diavazetai xwris
+        # to neighbor_lock. To FIB kanei thn egkatastash asygxrona.
+        # Me ECMP ola ta next hops mpainoun se ena multipath route.
+        gateways = [self.active_neighbors[h]['phys_ip'] for h in entry.hops() if h in self.active_neighbors]
+        if not gateways:
+            return
+        self.fib.set(key_prefix(key), gateways)
+
+    def remove_route(self, key):
+        self.fib.withdraw(key_prefix(key))
+
+    def route_budget(self):
+        # Posa bytes routes xwrane se ena datagram: to header metraei
+        # me megistes times sta varint pedia.
+        header = dv_pb2.DVHeader(version=1, router_id=self.router_name, seq=2**63,
+                                 sent_at_ms=2**63, fragment=2**31, fragment_count=2**31)
+        return self.max_payload - len(encode_header(header))
+
+    def send_dv_updates(self, triggered=False):
+        # Ta periodic updates stelnoun olo to table. Ta triggered stelnoun mono
+        # ta entries pou allaksan apo to teleutaio advertisement pros kathe geitona
+        # (delta), ektos an o geitonas den exei parei akoma full table.
+        # Olo to round, apo to seq mexri to teleutaio sendto, ginetai me to
+        # send_lock: ena delta me seq N+1 den prolavainei to full table me seq N
+        # (o geitonas tha petouse ola ta fragments tou san palia)
+        with self.send_lock:
+            prefix_type = "TRIGGERED" if triggered else "PERIODIC"
+            started = time.perf_counter()
+
+            with self.lock:
+                version = self.table_version
+                targets = []
+                need_full = False
+                for name, info in self.active_neighbors.items():
+                    adv_gen = info.get('adv_gen')
+                    if triggered and (adv_gen is None or adv_gen < version) and not self.scheduler.allow(name):
+                        # Rate limit: o scheduler tha ksanadokimasei argotera
+                        continue
+                    if triggered and adv_gen is not None and adv_gen >= version:
+                        continue
+                    # Me summarization stelnoume panta full table: ena delta gia ena
+                    # prefix pou einai mesa se summary den to aposyrei apo ton geitona
+                    if triggered and adv_gen is not None and self.summarizer is None:
+                        changes = self.changes_since(adv_gen)
+                    else:
+                        changes = None
+                        need_full = True
+                    info['adv_gen'] = version
+                    targets.append((name, info['phys_ip'], info['udp_port'], info.get('version', 1), changes))
+
+                # Oso exoun parei oloi oi geitones (kai to dhmosieumeno snapshot)
+                # den xreiazetai na to thymomaste
+                floor = min((info['adv_gen'] for info in self.active_neighbors.values() if info.get('adv_gen') is not None),
+                            default=version)
+                floor = min(floor, self.published.version)
+                while self.changes:
+                    key, gen = next(iter(self.changes.items()))
+                    if gen > floor:
+                        break
+                    del self.changes[key]
+
+                self.seq_no += 1
+                curr_seq = self.seq_no
+
+            # To full table erxetai apo to dhmosieumeno snapshot (version >= version,
+            # opote oi geitones pairnoun toulaxiston osa lene ta adv_gen tous).
+            # H kwdikopoihsh ginetai ektos lock kai mono an allakse to table.
+            if need_full:
+                snapshot = self.snapshot()
+                if self.update_cache.needs_update(snapshot.version):
+                    routes = snapshot.routes
+                    if self.summarizer:
+                        routes = self.summarizer.summarize(routes)
+                    self.update_cache.update(snapshot.version, routes)
+
+            for target_name, target_phys_ip, target_port, wire, changes in targets:
+                # Split Horizon with Poison Reverse: to UpdateCache stelnei ta routes
+                # pou mathame apo ton target_name me metric 16.
+                # Megala tables stelnontai se arithmimena fragments me to idio seq.
+                if changes is None:
+                    datagrams = self.update_cache.datagrams(target_name, wire)
                 else:
-                    r.metric = entry['metric']
-                
-                count += 1
-            
-            if count > 0:
-                data = msg.SerializeToString()
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                    datagrams = self.update_cache.delta_datagrams(target_name, changes, wire)
+                if not datagrams:
+                    continue
+
                 try:
-                    sock.sendto(data, (target_phys_ip, int(target_port)))
-                    if triggered: print(f"[{time.strftime('%H:%M:%S')}] [{prefix_type}] Sent update to {target_name} ({count} routes)")
-                except: pass
-                finally: sock.close()
+                    for index, (body, _) in enumerate(datagrams):
+                        header = dv_pb2.DVHeader(version=wire, router_id=self.router_name, seq=curr_seq,
+                                                 sent_at_ms=int(self.clock() * 1000),
+                                                 fragment=index, fragment_count=len(datagrams),
+                                                 delta=changes is not None)
+                        data = encode_header(header) + body
+                        self.send_sock.sendto(data, (target_phys_ip, int(target_port)))
+                        self.tx_datagrams.inc()
+                        self.tx_bytes.inc(len(data))
+                    if triggered:
+                        count = sum(n for _, n in datagrams)
+                        kind = "delta" if changes is not None else "full"
+                        log.debug(prefix_type, "Sent {kind} update to {neighbor} ({routes} routes, {datagrams} datagrams)",
+                                  kind=kind, neighbor=target_name, routes=count, datagrams=len(datagrams))
+                except Exception:
+                    self.tx_errors.inc()
+            self.tx_time[triggered].observe(time.perf_counter() - started)
 
     def periodic_dv_sender(self):
         # Stelnei to routing table kathe 20 deuterolepta se olous tous geitones
-        UPDATE_INTERVAL = 20 
-        print(f"[{time.strftime('%H:%M:%S')}] [System] Periodic DV Sender started ({UPDATE_INTERVAL}s)")
+        log.info('System', "Periodic DV Sender started ({interval}s)", interval=UPDATE_INTERVAL)
         while True:
             time.sleep(UPDATE_INTERVAL)
-            with self.lock:
-                now = time.time()
-                # Ananewsh timestamp gia ta topika routes wste na mhn ta svhsei o garbage collector
-                for prefix, entry in self.routing_table.items():
-                    if entry['next_hop'] == '-':
-                        entry['timestamp'] = now
-            
             self.send_dv_updates(triggered=False)
-            print(f"[{time.strftime('%H:%M:%S')}] [Periodic] Sent routing table update.")
+            log.debug('Periodic', "Sent routing table update.")
 
     def cleanup_systems(self):
-        print(f"[{time.strftime('%H:%M:%S')}] [System] Garbage Collector started")
+        log.info('System', "Garbage Collector started")
         counter = 0
         while True:
             time.sleep(1)
-            now = time.time()
             counter += 1
+            self.housekeeping(counter)
 
-            if counter == 20:
-                self.print_routing_table()
-                counter = 0
+    def housekeeping(self, counter):
+        # Ena vhma tou garbage collector, kathe 1 sec (counter: posa exoun ginei),
+        # koino gia ta dyo runtimes: dump tou table, snapshot, lhgmena routes/geitones
+        if self.dump_interval and counter % self.dump_interval == 0:
+            self.print_routing_table()
+        if self.restart_file and counter % SNAPSHOT_INTERVAL == 0:
+            self.save_snapshot()
+        self.expire(self.clock())
 
-            # 1. Elegxos gia "nekrous" geitones (TCP Keepalive timeout)
-            dead_neighbors = []
-            with self.lock:
-                for name, info in self.active_neighbors.items():
-                    # An exoume na lavoume Hello panw apo 15 sec, thewreitai dead
-                    if now - info['last_hello'] > 15:
-                        dead_neighbors.append(name)
+    def expire(self, now):
+        # 1. Elegxos gia "nekrous" geitones (TCP Keepalive timeout)
+        with self.neighbor_lock:
+            # An exoume na lavoume Hello panw apo 15 sec, thewreitai dead
+            dead_neighbors = self.neighbor_timers.expired(now, self.neighbor_last_hello)
+        
+        for name in dead_neighbors:
+            log.warn('Timeout', "Neighbor {neighbor} dead. Removing.", neighbor=name)
+            self.remove_neighbor(name)
+
+        # Geitones pou ekanan restart kai den gyrisan sto restart_time tous
+        for name, deadline in list(self.restarting.items()):
+            if now >= deadline:
+                log.warn('Restart', "Neighbor {neighbor} did not come back. Removing.", neighbor=name)
+                with self.lock:
+                    self.restarting.pop(name, None)
+                    self.withdraw_neighbor(name)
+                self.scheduler.trigger()
+
+        # To diko mas restart teleiwnei otan oloi oi geitones steiloun olo to table tous
+        if self.restart_deadline is not None and (now >= self.restart_deadline or self.restart_synced()):
+            self.reconcile(now)
+
+        # 2. Elegxos gia lhgmena routes (Route Timeout)
+        with self.lock:
+            # An ena route den exei ananewthei gia 60 sec, diagrafetai
+            to_remove = self.route_timers.expired(now, self.route_timestamp)
             
-            for name in dead_neighbors:
-                print(f"[{time.strftime('%H:%M:%S')}] [Timeout] Neighbor {name} dead. Removing.")
-                self.remove_neighbor(name)
+            for key in to_remove:
+                log.info('Timeout', "Route {prefix} via {next_hop} expired.",
+                         prefix=key_prefix(key), next_hop=self.routing_table.get_key(key).next_hop)
+                self.routing_table.delete_key(key)
+                self.mark_changed(key)
+                # Αφαιρούμε και από το kernel
+                self.remove_route(key)
 
-            # 2. Elegxos gia lhgmena routes (Route Timeout)
-            with self.lock:
-                to_remove = []
-                for prefix, entry in self.routing_table.items():
-                    # An ena route den exei ananewthei gia 60 sec, diagrafetai
-                    if entry['next_hop'] != '-' and (now - entry['timestamp'] > 60):
-                        to_remove.append(prefix)
-                
-                for prefix in to_remove:
-                    print(f"[{time.strftime('%H:%M:%S')}] [Timeout] Route {prefix} via {self.routing_table[prefix]['next_hop']} expired.")
-                    del self.routing_table[prefix]
-                    # Αφαιρούμε και από το kernel
-                    self.remove_route(prefix)
+    def neighbor_last_hello(self, name):
+        info = self.active_neighbors.get(name)
+        return info['last_hello'] if info is not None else None
+
+    def route_timestamp(self, key):
+        entry = self.routing_table.get_key(key)
+        if entry is None or entry.next_hop == '-':
+            return None
+        return entry.timestamp
 
     def start_udp_server(self):
         # Anoigei UDP socket gia na dexetai updates apo allous routers
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Megalo receive buffer: ena fragmented update ftanei san burst apo datagrams
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RCVBUF)
         sock.bind(('0.0.0.0', self.udp_port))
-        print(f"[{time.strftime('%H:%M:%S')}] [UDP] Listening on 0.0.0.0:{self.udp_port}")
+        log.info('UDP', "Listening on 0.0.0.0:{port}", port=self.udp_port)
+        self.udp_ready.set()
 
         while True:
             try:
-                data, _ = sock.recvfrom(4096)
-                msg = dv_pb2.DVMessage()
-                msg.ParseFromString(data)
-                self.process_dv_update(msg.header.router_id, msg.routes, msg.header.seq)
+                data, _ = sock.recvfrom(65535)
+                self.handle_datagram(data)
             except Exception as e:
-                print(f"[{time.strftime('%H:%M:%S')}] [!] UDP Error: {e}")
+                self.rx_errors.inc()
+                log.error('UDP', "UDP Error: {error}", error=e)
 
-    def process_dv_update(self, sender_name, routes, seq_no):
+    def start_ingest_workers(self):
+        # Ta workers kanoun bind sto UDP port me SO_REUSEPORT. To spawn pairnei
+        # peripou ena deuterolepto, opote perimenoume prin dextoume geitones:
+        # to full table tous erxetai amesws meta to handshake.
+        self.ingest = IngestPool(self.udp_port, self.rx_workers, UDP_RCVBUF)
+        self.ingest.wait_ready()
+        log.info('UDP', "Listening on 0.0.0.0:{port} with {workers} receive workers",
+                 port=self.udp_port, workers=self.rx_workers)
+        self.udp_ready.set()
+
+    def ingest_loop(self):
+        # Ta decoded batches efarmozontai sto table opws kai sto start_udp_server
+        for data in self.ingest.batches():
+            try:
+                self.handle_batch(data)
+            except Exception as e:
+                self.rx_errors.inc()
+                log.error('UDP', "UDP Error: {error}", error=e)
+
+    def handle_batch(self, data):
+        # Ena batch apo ena receive worker: ta routes einai hdh decoded kai ta
+        # palia h dipla fragments exoun petaxtei. O elegxos seq ginetai ksana
+        # sto process_dv_update, pou kserei kai gia ta nea sessions.
+        (datagrams, size, errors, stale), records = decode_batch(data)
+        for record in records:
+            self.process_dv_update(*record)
+        self.rx_datagrams.inc(datagrams)
+        self.rx_bytes.inc(size)
+        self.rx_stale.inc(stale)
+        if errors:
+            self.rx_errors.inc(errors)
+            log.error('UDP', "UDP Error: {errors} malformed datagrams", errors=errors)
+
+    def handle_datagram(self, data):
+        self.rx_datagrams.inc()
+        self.rx_bytes.inc(len(data))
+        start = time.perf_counter()
+        msg = dv_pb2.DVMessage()
+        msg.ParseFromString(data)
+        h = msg.header
+        routes = decode_routes(msg)
+        self.rx_decode.observe(time.perf_counter() - start)
+        self.process_dv_update(h.router_id, routes, h.seq, h.fragment, h.fragment_count, h.delta)
+
+    def process_dv_update(self, sender_name, routes, seq_no, fragment=0, fragment_count=1, delta=False):
+        # routes: lista apo (kleidi tou route_table, metric), idia gia v1 kai v2
         topology_changed = False
+        started = time.perf_counter()
         with self.lock:
             if sender_name not in self.active_neighbors:
+                early = self.early_updates.setdefault(sender_name, [])
+                if len(early) < EARLY_FRAGMENTS and len(self.early_updates) <= max(len(self.neighbors), 1) * 4:
+                    early.append((self.clock(), routes, seq_no, fragment, fragment_count, delta))
+                else:
+                    self.rx_stale.inc()
                 return
-            # Elegxos Sequence Number gia na aporripsoume palia paketa
-            last_seq = self.active_neighbors[sender_name].get('last_seq', -1)
-            if seq_no <= last_seq:
+            # Elegxos Sequence Number gia na aporripsoume palia paketa.
+            # Ta fragments enos update exoun to idio seq, opote gia to trexon seq
+            # dexomaste kathe fragment mia fora kai to efarmozoume anexarthta.
+            info = self.active_neighbors[sender_name]
+            last_seq = info.get('last_seq', -1)
+            if seq_no < last_seq or (seq_no == last_seq and fragment in info['seen_fragments']):
+                self.rx_stale.inc()
                 return
-            self.active_neighbors[sender_name]['last_seq'] = seq_no
+            if seq_no > last_seq:
+                info['last_seq'] = seq_no
+                info['seen_fragments'] = set()
+                info['snapshot'] = set()
+            info['seen_fragments'].add(fragment)
+            info['last_update'] = self.clock()
+            (self.rx_delta if delta else self.rx_full).inc()
+            self.rx_routes.inc(len(routes))
 
-            print(f"[{time.strftime('%H:%M:%S')}] [UDP-Recv] Update from {sender_name} (Seq: {seq_no})")
+            kind = "Delta" if delta else "Full"
+            log.debug('UDP-Recv', "{kind} update from {neighbor} (Seq: {seq}, Fragment: {fragment})",
+                      kind=kind, neighbor=sender_name, seq=seq_no, fragment=fragment)
 
-            for r in routes:
-                dest = r.prefix
+            summaries = self.summarizer.summaries if self.summarizer else None
+            for dest, metric in routes:
+                if not delta:
+                    info['snapshot'].add(dest)
+                if summaries and dest in summaries:
+                    # To summary to diafhmizoume emeis, ta components tou ta exoume hdh
+                    continue
                 # To neo kostos einai to kostos tou geitona + 1 (hop count)
-                new_metric = min(r.metric + 1, INFINITY)
+                new_metric = min(metric + 1, INFINITY)
+                current = self.routing_table.get_key(dest)
+                if (self.restored and dest in self.restored and current is not None
+                        and (sender_name in current.hops() or new_metric < current.metric)):
+                    # To route apo to restart snapshot to epivevaiwse (h to antikathista) ena trexon update
+                    self.restored.discard(dest)
+                    self.install_route(dest, current)
                 
                 # Eidhsh: To diktyo einai unreachable (Metric >= 16)
                 if new_metric >= INFINITY:
-                    if dest in self.routing_table and self.routing_table[dest]['next_hop'] == sender_name:
+                    if current is not None and sender_name in current.hops():
+                        # Se ECMP, an menoun alla next hops, vgazoume mono auton
+                        if current.remove_hop(sender_name):
+                            log.info('ECMP', "{prefix} dropped next hop {neighbor}", prefix=key_prefix(dest), neighbor=sender_name)
+                            topology_changed = True
+                            self.mark_changed(dest, current)
+                            self.install_route(dest, current)
                         # An o torinos mas next-hop pei oti to route pethane,
                         # to markaroume ws INFINITY (Poison) alla den to svhnoume amesws
                         # gia na prolavoume na enhmerwsoume tous allous.
-                        if self.routing_table[dest]['metric'] < INFINITY:
-                            self.routing_table[dest]['metric'] = INFINITY
-                            self.routing_table[dest]['timestamp'] = time.time() 
-                            print(f"[{time.strftime('%H:%M:%S')}] [Route Dead] {dest} via {sender_name} became unreachable (Metric 16)")
+                        elif current.metric < INFINITY:
+                            current.metric = INFINITY
+                            current.timestamp = self.clock() 
+                            log.info('Route Dead', "{prefix} via {neighbor} became unreachable (Metric 16)",
+                                     prefix=key_prefix(dest), neighbor=sender_name)
                             topology_changed = True
+                            self.mark_changed(dest, current)
                             # Αφαιρούμε το route από το kernel γιατί δεν είναι πλέον έγκυρο
                             self.remove_route(dest)
                     continue
 
                 # Kanonikh logikh Distance Vector
-                if dest not in self.routing_table:
+                if current is None:
                     # Neos proorismos pou den kserame
-                    self.routing_table[dest] = {
-                        'next_hop': sender_name, 
-                        'metric': new_metric, 
-                        'timestamp': time.time()
-                    }
-                    print(f"[{time.strftime('%H:%M:%S')}] [New Route] {dest} via {sender_name} (Cost {new_metric})")
+                    entry = self.routing_table.set_key(dest, sender_name, new_metric, self.clock())
+                    log.info('New Route', "{prefix} via {neighbor} (Cost {metric})",
+                             prefix=key_prefix(dest), neighbor=sender_name, metric=new_metric)
                     topology_changed = True
+                    self.mark_changed(dest, entry)
+                    self.route_timers.schedule(dest, entry.timestamp)
                     # Εγκαθιστούμε το νέο route στο kernel
-                    self.install_route(dest, sender_name)
+                    self.install_route(dest, entry)
                     
                 else:
-                    current = self.routing_table[dest]
-                    
                     # Periptwsh A: Vrikame kalytero monopati (mikrotero metric)
-                    if new_metric < current['metric']:
-                        self.routing_table[dest] = {
-                            'next_hop': sender_name, 
-                            'metric': new_metric, 
-                            'timestamp': time.time()
-                        }
-                        print(f"[{time.strftime('%H:%M:%S')}] [Better Path] {dest} via {sender_name} (Cost {new_metric})")
+                    if new_metric < current.metric:
+                        current.update(sender_name, new_metric, self.clock())
+                        log.info('Better Path', "{prefix} via {neighbor} (Cost {metric})",
+                                 prefix=key_prefix(dest), neighbor=sender_name, metric=new_metric)
                         topology_changed = True
+                        self.mark_changed(dest, current)
+                        self.route_timers.schedule(dest, current.timestamp)
                         # Ενημερώνουμε το kernel με το καλύτερο μονοπάτι
-                        self.install_route(dest, sender_name)
-                        
+                        self.install_route(dest, current)
+
+                    # Periptwsh ECMP: isodynamo monopati apo allo geitona, to prosthetoume
+                    elif (self.ecmp and new_metric == current.metric and current.next_hop != '-'
+                          and sender_name not in current.hops()):
+                        current.add_hop(sender_name)
+                        current.timestamp = self.clock()
+                        log.info('ECMP', "{prefix} via {next_hops} (Cost {metric})",
+                                 prefix=key_prefix(dest), next_hops=', '.join(current.hops()), metric=new_metric)
+                        topology_changed = True
+                        self.mark_changed(dest, current)
+                        self.install_route(dest, current)
+
                     # Periptwsh B: O router pou hdh xrhsimopoioume allakse to kostos tou
                     # Prepei na enimerwsoume to diko mas table, akoma kai an to kostos megalwse.
-                    elif current['next_hop'] == sender_name:
-                        current['timestamp'] = time.time()
-                        if new_metric != current['metric']:
-                            current['metric'] = new_metric
-                            print(f"[{time.strftime('%H:%M:%S')}] [Route Adj] {dest} metric changed to {new_metric} via {sender_name}")
+                    elif sender_name in current.hops():
+                        current.timestamp = self.clock()
+                        if new_metric != current.metric and current.remove_hop(sender_name):
+                            # Se ECMP ta ypoloipa next hops exoun akoma to kalytero kostos
+                            log.info('ECMP', "{prefix} dropped next hop {neighbor} (Cost {metric})",
+                                     prefix=key_prefix(dest), neighbor=sender_name, metric=new_metric)
                             topology_changed = True
+                            self.mark_changed(dest, current)
+                            self.install_route(dest, current)
+                        elif new_metric != current.metric:
+                            current.metric = new_metric
+                            log.info('Route Adj', "{prefix} metric changed to {metric} via {neighbor}",
+                                     prefix=key_prefix(dest), metric=new_metric, neighbor=sender_name)
+                            topology_changed = True
+                            self.mark_changed(dest, current)
+
+            # Ena full table (ola ta fragments tou) periexei ola ta routes tou geitona.
+            # Osa routes mesw autou leipoun, den ta exei pia: ta kanoume poison.
+            # Ta delta updates periexoun mono allages, opote den symperainoume tipota.
+            if not delta and len(info['seen_fragments']) >= max(fragment_count, 1):
+                info['synced'] = True
+                stale = [(dest, entry) for dest, entry in self.routing_table.routes.items()
+                         if entry.metric < INFINITY and sender_name in entry.hops()
+                         and dest not in info['snapshot']]
+                for dest, entry in stale:
+                    if entry.remove_hop(sender_name):
+                        log.info('ECMP', "{prefix} dropped next hop {neighbor}", prefix=key_prefix(dest), neighbor=sender_name)
+                        self.mark_changed(dest, entry)
+                        self.install_route(dest, entry)
+                        topology_changed = True
+                        continue
+                    entry.metric = INFINITY
+                    entry.timestamp = self.clock()
+                    log.info('Route Dead', "{prefix} no longer advertised by {neighbor}", prefix=key_prefix(dest), neighbor=sender_name)
+                    self.mark_changed(dest, entry)
+                    self.remove_route(dest)
+                    topology_changed = True
+                info['snapshot'] = set()
 
-        # An allakse kati ston pinaka, stelnoume amesws updates (Triggered Update)
+        self.rx_process.observe(time.perf_counter() - started)
+        # An allakse kati ston pinaka, zhtame triggered update apo ton scheduler
         if topology_changed:
-            threading.Thread(target=self.send_dv_updates, args=(True,)).start()
+            self.scheduler.trigger()
 
     def send_periodic_hellos(self):
         # Stelnei mikra TCP paketa "Hello" gia na diatirei th syndesh
         while True:
-            time.sleep(5)
-            msg = dv_pb2.HelloMessage()
-            msg.header.router_id = self.router_name 
-            data = msg.SerializeToString() 
-            
-            with self.lock:
-                neighbors = list(self.active_neighbors.items())
-            
-            for name, info in neighbors:
-                try: 
-                    info['tcp_conn'].sendall(data)
-                    print(f"[{time.strftime('%H:%M:%S')}] [Hello] Sent to {name}")
-                except: self.remove_neighbor(name)
+            time.sleep(HELLO_INTERVAL)
+            self.send_hellos()
 
-    def remove_neighbor(self, name):
+    def send_hellos(self):
+        msg = dv_pb2.HelloMessage()
+        msg.header.router_id = self.router_name 
+        # Se palious peers (xwris framing) to Hello stelnetai opws palia
+        data = {True: encode_frame(msg), False: msg.SerializeToString()}
+        
+        with self.neighbor_lock:
+            neighbors = list(self.active_neighbors.items())
+        
+        for name, info in neighbors:
+            try: 
+                info['tcp_conn'].sendall(data[info.get('framed', True)])
+                log.debug('Hello', "Sent to {neighbor}", neighbor=name)
+            except Exception: self.remove_neighbor(name, graceful=True)
+
+    def remove_neighbor(self, name, graceful=False, conn=None):
+        # graceful: to TCP session ekleise (px. o geitonas kanei restart), oxi
+        # timeout. An o geitonas zhthse restart_time, kratame ta routes tou
+        # (kai ta kernel routes) mexri na gyrisei h na lhksei o xronos.
+        # conn: to session pou ekleise. An o geitonas exei hdh neo session, den
+        # to peirazoume.
+        restarting = False
         with self.lock:
-            if name in self.active_neighbors:
-                try: self.active_neighbors[name]['tcp_conn'].close()
-                except: pass
+            info = self.active_neighbors.get(name)
+            if info is None or (conn is not None and info['tcp_conn'] is not conn):
+                return
+            try: info['tcp_conn'].close()
+            except Exception: pass
+            with self.neighbor_lock:
                 del self.active_neighbors[name]
-                
-                # Otan enas geitonas "pethainei", den svhnoume ta routes tou amesws.
-                # Ta "dhlitiriazoume" (Poison) thetontas metric = 16.
-                # Auto ginetai gia na mathei to ypoloipo diktyo oti ta routes pethanan.
-                poisoned_count = 0
-                routes_to_remove = []
-                for prefix, entry in self.routing_table.items():
-                    if entry['next_hop'] == name:
-                        entry['metric'] = INFINITY
-                        entry['timestamp'] = time.time() 
-                        poisoned_count += 1
-                        routes_to_remove.append(prefix)
-                
-                # Αφαιρούμε τα routes από το kernel (έξω από το lock)
-                for prefix in routes_to_remove:
-                    self.remove_route(prefix)
-                
-                print(f"[{time.strftime('%H:%M:%S')}] [Cleanup] Poisoned {poisoned_count} routes via {name}")
+            self.early_updates.pop(name, None)
+
+            if graceful and info.get('restart_time'):
+                self.restarting[name] = self.clock() + info['restart_time']
+                restarting = True
+                log.info('Restart', "{neighbor} is restarting, keeping its routes for {seconds}s",
+                         neighbor=name, seconds=info['restart_time'])
+            else:
+                self.withdraw_neighbor(name)
         
+        if self.liveness:
+            self.liveness.remove(name)
+
         # Triggered update gia na pame ta asxhma nea stous allous
-        threading.Thread(target=self.send_dv_updates, args=(True,)).start()
+        self.scheduler.forget(name)
+        if not restarting:
+            self.scheduler.trigger()
+        self.reconnect(info['phys_ip'])
+
+    def reconnect(self, ip):
+        # Enas geitonas apo th grammh entolwn pou vgike (liveness, Hello timeout
+        # h kleisimo tou TCP) ksanasyndeetai opws sthn ekkinhsh. Alliws to
+        # adjacency den ksanaanevainei, giati kamia pleura den ksanakanei connect.
+        # To prwto connect ginetai meta apo CONNECT_RETRY_MIN, oxi amesws.
+        if self.stopping.is_set():
+            return
+        for nip, nport in self.neighbors:
+            if nip == ip:
+                self.start_connect(nip, nport, CONNECT_RETRY_MIN)
+
+    def withdraw_neighbor(self, name):
+        # Kaleitai me to self.lock kratimeno.
+        # Otan enas geitonas "pethainei", den svhnoume ta routes tou amesws.
+        # Ta "dhlitiriazoume" (Poison) thetontas metric = 16.
+        # Auto ginetai gia na mathei to ypoloipo diktyo oti ta routes pethanan.
+        poisoned_count = 0
+        routes_to_remove = []
+        pruned = []
+        for key, entry in self.routing_table.routes.items():
+            if entry.next_hops is not None and name in entry.next_hops:
+                # ECMP: to route menei me ta ypoloipa next hops, xwris reconvergence
+                entry.remove_hop(name)
+                pruned.append((key, entry))
+            elif entry.next_hop == name:
+                entry.metric = INFINITY
+                entry.timestamp = self.clock() 
+                poisoned_count += 1
+                routes_to_remove.append(key)
+        
+        # Afairoume ta routes apo to kernel (to FIB ta stelnei ektos lock)
+        for key in routes_to_remove:
+            self.mark_changed(key)
+            self.remove_route(key)
+        for key, entry in pruned:
+            self.mark_changed(key, entry)
+            self.install_route(key, entry)
+        
+        log.info('Cleanup', "Poisoned {poisoned} routes via {neighbor}"
+                 + (", kept {kept} ECMP routes on remaining next hops" if pruned else ""),
+                 poisoned=poisoned_count, neighbor=name, kept=len(pruned))
+
+    def conn_params(self):
+        # Handshake: Antallagh onomatwn kai UDP ports me ton geitona
+        my = dv_pb2.ConnParamMessage()
+        my.header.router_id = self.router_name; my.port = self.udp_port
+        my.header.version = self.wire_version
+        if self.liveness:
+            my.liveness_port = self.liveness.port
+        my.restart_time = self.restart_time
+        return encode_handshake(my)
+
+    def add_neighbor(self, other, conn, real_ip, framed=True):
+        neighbor_name = other.header.router_id
+        # Palioi peers den stelnoun version (0): tous milame v1
+        wire = min(self.wire_version, max(other.header.version, 1))
+        log.info('Connected', "{neighbor} (IP: {ip}, wire v{wire})", neighbor=neighbor_name, ip=real_ip, wire=wire)
+        
+        with self.lock:
+            self.register_neighbor(neighbor_name, conn, real_ip, other.port, wire, other.restart_time, framed)
+            if self.restarting.pop(neighbor_name, None) is not None:
+                # Gyrise apo restart: to prwto full table tou tha afairesei osa den exei pia
+                log.info('Restart', "{neighbor} is back", neighbor=neighbor_name)
+            early = self.early_updates.pop(neighbor_name, [])
+            # Osa perimenoun apo allous (px. palio session) kai lhksan petiountai
+            now = self.clock()
+            self.early_updates = {name: updates for name, updates in self.early_updates.items()
+                                  if now - updates[-1][0] <= EARLY_WINDOW}
+        for received, routes, seq_no, fragment, fragment_count, delta in early:
+            if now - received <= EARLY_WINDOW:
+                self.process_dv_update(neighbor_name, routes, seq_no, fragment, fragment_count, delta)
+
+        # To liveness session anevainei mono an to trexoun kai oi dyo pleures
+        if self.liveness and other.liveness_port:
+            self.liveness.add(neighbor_name, real_ip, other.liveness_port)
+        
+        # Molus syndethoume, stelnoume olo to routing table
+        self.send_dv_updates(triggered=True)
+        return neighbor_name
+
+    def register_neighbor(self, name, conn, phys_ip, udp_port, wire, restart_time=0, framed=True):
+        # Kaleitai me to self.lock kratimeno. H katastash enos geitona se ena
+        # meros (to add_neighbor kai ta benchmarks xekinane apo edw)
+        with self.neighbor_lock:
+            info = self.active_neighbors[name] = {
+                'tcp_conn': conn, 
+                'udp_port': udp_port, 
+                'phys_ip': phys_ip,
+                'last_hello': self.clock(),
+                'last_seq' : -1,
+                'seen_fragments': set(),
+                'snapshot': set(),
+                'adv_gen': None,
+                'version': wire,
+                'framed': framed,
+                'restart_time': restart_time
+            }
+            self.neighbor_timers.schedule(name, info['last_hello'])
+        return info
+
+    def hello_received(self, neighbor_name):
+        # Mono to neighbor_lock: ena Hello den perimenei ena megalo update
+        # na teleiwsei sto table (kai o geitonas den lhgei adika)
+        with self.neighbor_lock:
+            if neighbor_name in self.active_neighbors:
+                self.active_neighbors[neighbor_name]['last_hello'] = self.clock()
+                self.hellos.inc()
+                log.debug('Hello', "Received from {neighbor}", neighbor=neighbor_name)
 
     def handle_connection(self, conn, addr, initiated):
         neighbor_name = None
+        error = None
         try:
-            # Handshake: Antallagh onomatwn kai UDP ports me ton geitona
-            my = dv_pb2.ConnParamMessage()
-            my.header.router_id = self.router_name; my.port = self.udp_port
-            
+            # To handshake exei timeout: enas geitonas pou den apantaei den
+            # krataei to thread gia panta
+            conn.settimeout(HANDSHAKE_TIMEOUT)
             if initiated:
-                conn.sendall(my.SerializeToString())
-                data = conn.recv(1024)
-                if not data: return
-                other = dv_pb2.ConnParamMessage(); other.ParseFromString(data)
-            else:
-                data = conn.recv(1024) 
-                if not data: return
-                other = dv_pb2.ConnParamMessage(); other.ParseFromString(data)
-                conn.sendall(my.SerializeToString())
-
-            neighbor_name = other.header.router_id
-            real_ip = addr[0]
-            print(f"[{time.strftime('%H:%M:%S')}] [Connected] {neighbor_name} (IP: {real_ip})")
-            
-            with self.lock:
-                self.active_neighbors[neighbor_name] = {
-                    'tcp_conn': conn, 
-                    'udp_port': other.port, 
-                    'phys_ip': real_ip,
-                    'last_hello': time.time(),
-                    'last_seq' : -1
-                }
-            
-            # Molus syndethoume, stelnoume olo to routing table
-            self.send_dv_updates(triggered=True)
+                conn.sendall(self.conn_params())
+            data, reader, pending = read_handshake(conn)
+            if data is None: return
+            conn.settimeout(None)
+            neighbor_name = self.open_session(data, conn, addr[0], reader, initiated)
 
-            # Loop pou akouei gia Hello messages
+            # Loop pou akouei gia Hello messages (ena recv mporei na fernei polla)
             while True:
-                data = conn.recv(1024)
+                for frame in pending:
+                    self.handle_frame(neighbor_name, frame)
+                data = conn.recv(4096)
                 if not data: break
-                try: 
-                    h = dv_pb2.HelloMessage()
-                    h.ParseFromString(data)
-                    with self.lock:
-                        if neighbor_name in self.active_neighbors:
-                            self.active_neighbors[neighbor_name]['last_hello'] = time.time()
-                            print(f"[{time.strftime('%H:%M:%S')}] [Hello] Received from {neighbor_name}")
-                except: pass
-        except: pass
+                pending = reader.feed(data)
+        except Exception as e:
+            error = e
         finally:
-            conn.close()
-            if neighbor_name: self.remove_neighbor(neighbor_name)
+            self.close_session(neighbor_name, conn, addr[0], initiated, error)
+
+    def open_session(self, data, conn, ip, reader, initiated):
+        # To handshake tou geitona (data) eftase: koino gia ta dyo runtimes.
+        # O initiator exei hdh steilei to diko tou, o allos apantaei twra.
+        # Ta mhnymata meta to handshake einai length-prefixed frames, ektos
+        # an o geitonas einai palios router (ena mhnyma ana recv).
+        other = dv_pb2.ConnParamMessage(); other.ParseFromString(data)
+        if not initiated:
+            conn.sendall(self.conn_params())
+        return self.add_neighbor(other, conn, ip, isinstance(reader, FrameReader))
+
+    def close_session(self, neighbor_name, conn, ip, initiated, error=None):
+        # To TCP session ekleise (h to handshake apetyxe): koino gia ta dyo runtimes
+        if error is not None:
+            log.warn('TCP', "TCP Error ({peer}): {error}", peer=neighbor_name or ip, error=str(error) or type(error).__name__)
+        conn.close()
+        if neighbor_name: self.remove_neighbor(neighbor_name, graceful=True, conn=conn)
+        elif initiated: self.reconnect(ip)
+
+    def handle_frame(self, neighbor_name, frame):
+        h = dv_pb2.HelloMessage()
+        h.ParseFromString(frame)
+        self.hello_received(neighbor_name)
 
     def start_tcp_server(self):
         # TCP server gia thn arxikh syndesh twn geitonwn
@@ -367,75 +1005,200 @@ class Router:
             while True:
                 c, a = s.accept()
                 threading.Thread(target=self.handle_connection, args=(c, a, False), daemon=True).start()
-        except Exception as e: print(f"[{time.strftime('%H:%M:%S')}] [Server Error] {e}")
+        except Exception as e: log.error('TCP', "Server Error: {error}", error=e)
+
+    def neighbor_connected(self, ip):
+        with self.neighbor_lock:
+            return any(info['phys_ip'] == ip for info in self.active_neighbors.values())
 
     def connect_neighbors(self):
-        time.sleep(2)
-        # Prospathoume na syndethoume energitika stous geitones pou dothikan sthn eisodo
+        # Prospathoume na syndethoume energitika stous geitones pou dothikan sthn eisodo,
+        # molis akouei to UDP socket mas (to full table tous erxetai amesws meta)
+        self.udp_ready.wait(5)
         for nip, nport in self.neighbors:
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                s.connect((nip, int(nport)))
-                threading.Thread(target=self.handle_connection, args=(s, (nip, nport), True), daemon=True).start()
-            except: print(f"[{time.strftime('%H:%M:%S')}] [Fail] Connect to {nip}")
+            self.start_connect(nip, nport)
+
+    def start_connect(self, nip, nport, wait=0):
+        # To poly ena connect ana geitona trexei kathe fora
+        with self.neighbor_lock:
+            if nip in self.connecting:
+                return
+            self.connecting.add(nip)
+        self.spawn_connect(nip, nport, wait)
+
+    def spawn_connect(self, nip, nport, wait):
+        threading.Thread(target=self.connect_neighbor, args=(nip, nport, wait), daemon=True).start()
+
+    def connect_neighbor(self, nip, nport, wait=0):
+        # An o geitonas den akouei akoma ksanadokimazoume me exponential backoff,
+        # mexri na syndethoume (h na syndethei autos se emas)
+        delay = CONNECT_RETRY_MIN
+        time.sleep(wait)
+        try:
+            while not self.neighbor_connected(nip):
+                try:
+                    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    s.connect((nip, int(nport)))
+                    threading.Thread(target=self.handle_connection, args=(s, (nip, nport), True), daemon=True).start()
+                    return
+                except OSError:
+                    s.close()
+                    if delay == CONNECT_RETRY_MIN:
+                        log.warn('Fail', "Connect to {ip}, retrying", ip=nip)
+                time.sleep(delay)
+                delay = min(delay * 2, CONNECT_RETRY_MAX)
+        finally:
+            with self.neighbor_lock:
+                self.connecting.discard(nip)
 
     def run(self):
         # Ekkini ola ta threads
+        self.start_metrics()
+        self.fib.start()
+        self.scheduler.start()
+        if self.liveness:
+            self.liveness.start()
+        if self.rx_workers:
+            self.start_ingest_workers()
+            threading.Thread(target=self.ingest_loop, daemon=True).start()
+        else:
+            threading.Thread(target=self.start_udp_server, daemon=True).start()
         threading.Thread(target=self.start_tcp_server, daemon=True).start()
-        threading.Thread(target=self.start_udp_server, daemon=True).start()
         threading.Thread(target=self.periodic_dv_sender, daemon=True).start()
         threading.Thread(target=self.send_periodic_hellos, daemon=True).start()
         threading.Thread(target=self.cleanup_systems, daemon=True).start()
         self.connect_neighbors()
+        if threading.current_thread() is threading.main_thread():
+            # docker stop stelnei SIGTERM: termatizoume kanonika gia na graftei to snapshot
+            signal.signal(signal.SIGTERM, lambda *_: self.stop())
         try:
-            while True: time.sleep(1)
-        except KeyboardInterrupt: print(f"[{time.strftime('%H:%M:%S')}] Exit")
+            while not self.stopping.wait(1): pass
+        except KeyboardInterrupt: pass
+        finally:
+            log.info('System', "Exit")
+            self.shutdown()
 
-    def print_routing_table(self):
-        print(f"\n[{time.strftime('%H:%M:%S')}] " + "=" * 60)
-        print(f"[{time.strftime('%H:%M:%S')}] [Routing Table @ {self.router_name}]")
-        print(f"[{time.strftime('%H:%M:%S')}] " + "=" * 60)
+    def stop(self):
+        self.stopping.set()
 
-        if not self.routing_table:
-            print(f"[{time.strftime('%H:%M:%S')}]    (Empty Routing Table)")
-        else:
-            sorted_routes = sorted(self.routing_table.items())
-            
-            for prefix, entry in sorted_routes:
-                metric = entry['metric']
-                next_hop = entry['next_hop']
-                
-                if metric >= INFINITY:
-                    arrow = "[!]"             
-                    status = " << DEAD >>"    
-                    metric_str = f"{metric}"
-                else:
-                    arrow = "→  "
-                    status = ""
-                    metric_str = f"{metric}"
+    def shutdown(self):
+        # Ta kernel routes menoun: me graceful restart to epomeno process ta ypiothetei
+        if self.ingest:
+            self.ingest.close()
+        if self.restart_file:
+            self.save_snapshot()
+            log.info('Restart', "Saved routing table to {path}", path=self.restart_file)
+        log.flush()
 
-                print(f"[{time.strftime('%H:%M:%S')}] {arrow} {prefix:<18} next-hop: {next_hop:<10} metric: {metric_str:<3}{status}")
-                entry["last_metric"] = metric
+    def start_metrics(self):
+        if self.metrics_port:
+            self.metrics.serve(self.metrics_port, self.metrics_addr)
+            log.info('Metrics', "Serving Prometheus metrics on http://{addr}:{port}/metrics",
+                     addr=self.metrics_addr, port=self.metrics_port)
 
-        print(f"[{time.strftime('%H:%M:%S')}] " + "-" * 60)
-        print(f"[{time.strftime('%H:%M:%S')}] [Active Neighbors]")
-        if not self.active_neighbors:
-            print(f"[{time.strftime('%H:%M:%S')}]    (No Active Neighbors)")
-        else:
-            for name, info in self.active_neighbors.items():
-                ago = time.time() - info["last_hello"]
-                l_seq = info.get('last_seq', -1)
-                print(f"[{time.strftime('%H:%M:%S')}] • {name:<10} IP: {info['phys_ip']:<15} lastSeq: {l_seq:<5} last_hello: {ago:.1f}s ago")
-        print(f"[{time.strftime('%H:%M:%S')}] " + "=" * 60 + "\n")
+    def print_routing_table(self):
+        # To prwto dump grafei olo to table, ta epomena mono osa entries allaksan
+        # h diagrafhkan apo to prohgoumeno. Sygkrinoume dyo dhmosieumena
+        # snapshots, opote den kratame to self.lock. To format kai to I/O ta kanei to log.
+        snapshot = self.snapshot()
+        previous = self.dumped.routes if self.dumped is not None else {}
+        self.dumped = snapshot
+        changed = sorted((key, via if type(via) is tuple else (via,), metric)
+                         for key, (via, metric) in snapshot.routes.items() if previous.get(key) != (via, metric))
+        removed = sorted(previous.keys() - snapshot.routes.keys())
+        with self.neighbor_lock:
+            neighbors = [(name, info['phys_ip'], info.get('last_seq', -1), self.clock() - info['last_hello'])
+                         for name, info in self.active_neighbors.items()]
+
+        full = not previous
+        log.info('Table', "Routing Table @ {router}: {total} routes" + ("" if full else ", {changed} changed, {removed} removed"),
+                 router=self.router_name, total=len(snapshot), changed=len(changed), removed=len(removed))
+        for key, hops, metric in changed:
+            if metric >= INFINITY:
+                fmt = "[!] {prefix:<18} next-hop: {next_hop:<10} metric: {metric:<3} << DEAD >>"
+            else:
+                fmt = "→   {prefix:<18} next-hop: {next_hop:<10} metric: {metric:<3}"
+            log.info('Table', fmt, prefix=key_prefix(key), next_hop=','.join(hops), metric=metric)
+        for key in removed:
+            log.info('Table', "x   {prefix:<18} removed", prefix=key_prefix(key))
+
+        stats = self.scheduler.stats()
+        log.info('Updates', "triggers: {triggers} merged: {merged} sent: {flushes} rate-limited: {deferred}", **stats)
+        if self.summarizer:
+            log.info('Summary', "{routes_in} routes advertised as {routes_out} (compression {ratio:.1f}x)",
+                     routes_in=self.summarizer.routes_in, routes_out=self.summarizer.routes_out,
+                     ratio=self.summarizer.ratio())
+        if not neighbors:
+            log.info('Neighbors', "(No Active Neighbors)")
+        for name, ip, l_seq, ago in neighbors:
+            log.info('Neighbors', "{neighbor:<10} IP: {ip:<15} lastSeq: {last_seq:<5} last_hello: {ago:.1f}s ago",
+                     neighbor=name, ip=ip, last_seq=l_seq, ago=ago)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 4:
-        print(f"[{time.strftime('%H:%M:%S')}] Usage: python router.py <ROUTER_NAME> <tcp> <udp> [neighbor_ip:port ...]")
-        sys.exit(1)
-    
-    name = sys.argv[1]
-    tcp = sys.argv[2]
-    udp = sys.argv[3]
-    neighbors = [x.split(':') for x in sys.argv[4:]]
+    parser = argparse.ArgumentParser(usage="python router.py <ROUTER_NAME> <tcp> <udp> [neighbor_ip:port ...] [options]")
+    parser.add_argument('name')
+    parser.add_argument('tcp')
+    parser.add_argument('udp')
+    parser.add_argument('neighbors', nargs='*')
+    parser.add_argument('--fib', choices=['batch', 'netlink', 'fake'], default='batch',
+                        help="kernel programming backend (default: ip -batch)")
+    parser.add_argument('--mtu', type=int, default=1500,
+                        help="path MTU used to split DV updates into datagrams (default: 1500)")
+    parser.add_argument('--hold-min', type=float, default=1.0,
+                        help="minimum triggered-update hold-down window in seconds (default: 1)")
+    parser.add_argument('--hold-max', type=float, default=5.0,
+                        help="maximum triggered-update hold-down window in seconds (default: 5)")
+    parser.add_argument('--neighbor-interval', type=float, default=1.0,
+                        help="minimum seconds between triggered updates to one neighbor (default: 1)")
+    parser.add_argument('--liveness-port', type=int, default=0,
+                        help="enable fast UDP liveness sessions on this port (default: off)")
+    parser.add_argument('--liveness-interval', type=float, default=50,
+                        help="liveness heartbeat interval in ms (default: 50)")
+    parser.add_argument('--liveness-multiplier', type=int, default=3,
+                        help="missed heartbeats before a neighbor is declared down (default: 3)")
+    parser.add_argument('--summarize', action='append', metavar='PREFIX',
+                        help="summarize advertised routes inside this boundary prefix (repeatable, default: off)")
+    parser.add_argument('--wire', type=int, choices=[1, 2], default=WIRE_VERSION,
+                        help="highest DV update wire format to negotiate (default: 2)")
+    parser.add_argument('--ecmp', action='store_true',
+                        help="keep all equal-cost next hops and install multipath routes")
+    parser.add_argument('--log-level', choices=['debug', 'info', 'warn', 'error'], default='info',
+                        help="lowest level written to the log (default: info, debug adds per-packet messages)")
+    parser.add_argument('--log-format', choices=['text', 'json'], default='text',
+                        help="text lines or one JSON object per line (default: text)")
+    parser.add_argument('--log-file', help="append the log to this file instead of stdout")
+    parser.add_argument('--dump-table', type=int, default=0, metavar='SECONDS',
+                        help="log the routing table every SECONDS, only changed entries after the first (default: off)")
+    parser.add_argument('--metrics-port', type=int, default=0,
+                        help="serve Prometheus metrics over HTTP on this port (default: off)")
+    parser.add_argument('--metrics-addr', default='127.0.0.1',
+                        help="address for the metrics endpoint (default: 127.0.0.1)")
+    parser.add_argument('--restart-file', metavar='PATH',
+                        help="graceful restart: snapshot the table here and restore it on start (default: off)")
+    parser.add_argument('--restart-time', type=int, default=RESTART_TIME,
+                        help="seconds neighbors keep our routes while we restart (default: 30)")
+    parser.add_argument('--rx-workers', type=int, default=0,
+                        help="decode DV updates in this many processes sharing the UDP port (SO_REUSEPORT, default: 0, in-process)")
+    parser.add_argument('--runtime', choices=['threads', 'asyncio'], default='threads',
+                        help="threads: one thread per connection/timer, asyncio: single event loop")
+    args = parser.parse_args()
+
+    neighbors = [x.split(':') for x in args.neighbors]
+
+    log.configure(level=args.log_level, json_lines=args.log_format == 'json',
+                  stream=open(args.log_file, 'a') if args.log_file else None)
+    log.start()
+
+    router_class = Router
+    if args.runtime == 'asyncio':
+        from aio_router import AsyncRouter
+        router_class = AsyncRouter
     
-    Router(name, tcp, udp, neighbors).run()
\ No newline at end of file
+    router_class(args.name, args.tcp, args.udp, neighbors, fib_backend=args.fib, mtu=args.mtu,
+                 hold_min=args.hold_min, hold_max=args.hold_max, neighbor_interval=args.neighbor_interval,
+                 liveness_port=args.liveness_port, liveness_interval=args.liveness_interval / 1000.0,
+                 liveness_multiplier=args.liveness_multiplier, summarize=args.summarize,
+                 wire_version=args.wire, ecmp=args.ecmp, dump_interval=args.dump_table,
+                 metrics_port=args.metrics_port, metrics_addr=args.metrics_addr,
+                 restart_file=args.restart_file, restart_time=args.restart_time,
+                 rx_workers=args.rx_workers).run()
@@ -0,0 +1,92 @@
+import random
+import threading
+import time
+
+
+class UpdateScheduler:
+    # Syntonizei ta triggered updates (RIP-style hold-down).
+    # Kathe allagh apla shmeiwnei to table ws dirty. Ena mono thread kanei flush:
+    # an den exei ginei triggered update sto teleutaio parathyro stelnei amesws,
+    # alliws perimenei to telos tou parathyrou kai stelnei mia fora gia oles tis allages.
+    # To parathyro einai tyxaio sto [hold_min, hold_max] gia na mhn sygxronizontai oi routers.
+    def __init__(self, send, hold_min=1.0, hold_max=5.0, neighbor_interval=1.0, clock=time.time, rng=random):
+        self.send = send
+        self.hold_min = hold_min
+        self.hold_max = hold_max
+        self.neighbor_interval = neighbor_interval
+        self.clock = clock
+        self.rng = rng            # pigh tou jitter (to simulator dinei diko tou random.Random)
+
+        self.cond = threading.Condition()
+        self.dirty = False
+        self.next_flush = 0.0     # prin apo auto den ginetai neo flush
+        self.last_sent = {}       # neighbor -> teleutaio triggered send
+        # Proairetiko callback otan to table ginetai dirty (gia to asyncio runtime,
+        # pou trexei to flush sto event loop anti gia to run() thread)
+        self.wakeup = None
+
+        self.triggers = 0         # poses allages zhthsan update
+        self.merged = 0           # poses apo autes enwthikan se hdh ekkremes update
+        self.flushes = 0          # posa updates stalthikan telika
+        self.deferred = 0         # sends pou kathysterhse to rate limit ana geitona
+
+    def trigger(self):
+        with self.cond:
+            self.triggers += 1
+            if self.dirty:
+                self.merged += 1
+            self.dirty = True
+            self.cond.notify()
+        if self.wakeup:
+            self.wakeup()
+
+    def allow(self, neighbor):
+        # Rate limit ana geitona: an tou steilame prosfata, to update tou
+        # anavalletai kai to table menei dirty gia to epomeno flush.
+        now = self.clock()
+        with self.cond:
+            last = self.last_sent.get(neighbor)
+            if last is not None and now - last < self.neighbor_interval:
+                self.deferred += 1
+                self.dirty = True
+                self.cond.notify()
+                return False
+            self.last_sent[neighbor] = now
+            return True
+
+    def forget(self, neighbor):
+        with self.cond:
+            self.last_sent.pop(neighbor, None)
+
+    def poll(self, now):
+        # True an prepei na ginei flush twra
+        with self.cond:
+            if not self.dirty or now < self.next_flush:
+                return False
+            self.dirty = False
+            self.flushes += 1
+            self.next_flush = now + self.rng.uniform(self.hold_min, self.hold_max)
+            return True
+
+    def next_deadline(self):
+        with self.cond:
+            return self.next_flush if self.dirty else None
+
+    def stats(self):
+        with self.cond:
+            return {'triggers': self.triggers, 'merged': self.merged,
+                    'flushes': self.flushes, 'deferred': self.deferred}
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.dirty:
+                    self.cond.wait()
+                delay = self.next_flush - self.clock()
+            if delay > 0:
+                time.sleep(delay)
+            if self.poll(self.clock()):
+                self.send()
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
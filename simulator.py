@@ -0,0 +1,450 @@
+import heapq
+import itertools
+import os
+import random
+import tempfile
+import time
+from collections import deque
+
+from framing import FrameReader, stream_reader
+from route_table import MASKS, address_int, prefix_key
+from router import Router, HELLO_INTERVAL, UPDATE_INTERVAL, NEIGHBOR_TIMEOUT, INFINITY
+import dv_pb2
+
+# Discrete-event simulator: polloi Router se ena process, xwris Docker, sockets h kernel.
+# Kathe router pairnei ena virtual clock (VirtualClock), ena virtual UDP socket
+# (SimSocket) kai virtual TCP syndeseis (SimConn) me ton geitona, kai to FIB tou
+# trexei me to fake backend. Ta threads tou Router (timers, scheduler, FIB) ta
+# antikathistoun events se ena heap, opote to run einai ntetermenistiko gia ena seed.
+# Metrame xrono sygklishs, mhnymata/bytes kai megisto megethos table, gia thn
+# arxikh sygklish kai meta apo apotyxies (link h router) h restart enos router.
+
+UDP_PORT = 5001
+TCP_PORT = 5000
+EXPIRE_INTERVAL = 1
+
+
+class VirtualClock:
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+class SimSocket:
+    # Antikathista to send_sock tou Router
+    def __init__(self, network, name):
+        self.network = network
+        self.name = name
+
+    def sendto(self, data, addr):
+        self.network.send_datagram(self.name, addr, data)
+        return len(data)
+
+
+class SimConn:
+    # H mia pleura mias TCP syndeshs (src -> dst), me to interface sendall/close
+    def __init__(self, network, src, dst):
+        self.network = network
+        self.src = src
+        self.dst = dst
+        self.reader = FrameReader()
+        self.closed = False
+
+    def sendall(self, data):
+        if self.closed:
+            raise ConnectionError("connection closed")
+        self.network.send_stream(self, data)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.network.close_stream(self)
+
+
+class SimRouter(Router):
+    def __init__(self, network, name, ip, prefixes, kernel=None, **options):
+        self.network = network
+        self.ip = ip
+        self.local_prefixes = prefixes
+        # Ta routes pou afhse sto (virtual) kernel to prohgoumeno process
+        self.kernel = kernel or {}
+        super().__init__(name, TCP_PORT, UDP_PORT, [], fib_backend='fake',
+                         clock=network.clock, transport=SimSocket(network, name), **options)
+        # To jitter tou hold-down erxetai apo to random.Random tou Network
+        self.scheduler.rng = network.rng
+
+    def init_local_routes(self):
+        # Ta topika diktya erxontai apo thn topologia anti gia to "ip route show"
+        self.fib.backend.routes.update(self.kernel)
+        self.kernel_routes = {prefix_key(prefix): gateways for prefix, gateways in self.kernel.items()}
+        with self.lock:
+            for prefix in self.local_prefixes:
+                key = prefix_key(prefix)
+                self.mark_changed(key, self.routing_table.set_key(key, '-', 0, self.clock()))
+
+    def mark_changed(self, key, entry=None):
+        super().mark_changed(key, entry)
+        # H diagrafh enos hdh poisoned route apo ton garbage collector den
+        # allazei to forwarding, opote den metraei sth sygklish
+        if self.routing_table.get_key(key) is not None:
+            self.network.route_changed()
+
+
+class Network:
+    def __init__(self, latency=0.001, seed=1, graceful_restart=False, **router_options):
+        # Diko tou random.Random: to global random den allazei gia ton ypoloipo kwdika
+        self.rng = random.Random(seed)
+        self.latency = latency
+        self.router_options = router_options
+        # Me graceful_restart kathe router exei restart file (se proswrino katalogo)
+        self.restart_dir = tempfile.mkdtemp(prefix='dv-sim-') if graceful_restart else None
+        self.clock = VirtualClock()
+        self.events = []
+        self.counter = itertools.count()
+
+        self.routers = {}      # name -> SimRouter
+        self.by_addr = {}      # (ip, udp port) -> name
+        self.links = {}        # frozenset((a, b)) -> True an to link einai panw
+        self.conns = {}        # (a, b) -> SimConn apo ton a pros ton b
+        self.down = set()      # routers pou exoun pesei
+        self.armed = {}        # name -> deadline tou scheduler pou exei hdh event
+        self.fib_armed = set()
+
+        self.udp_messages = 0
+        self.udp_bytes = 0
+        self.tcp_frames = 0
+        self.tcp_bytes = 0
+        self.dropped = 0
+        self.processed = 0
+        self.last_change = 0.0
+        self.at_last_change = (0, 0)
+        self.peak_routes = 0
+
+    # --- events ---
+
+    def at(self, when, fn, *args):
+        heapq.heappush(self.events, (when, next(self.counter), fn, args))
+
+    def run(self, until):
+        while self.events and self.events[0][0] <= until:
+            when, _, fn, args = heapq.heappop(self.events)
+            self.clock.now = when
+            fn(*args)
+            self.processed += 1
+        self.clock.now = max(self.clock.now, until)
+
+    def run_until_quiet(self, quiet, limit):
+        # Trexei mexri na mhn allaksei kanena route gia quiet sec (h mexri to limit)
+        while True:
+            deadline = min(self.last_change + quiet, limit)
+            self.run(deadline)
+            if self.clock.now >= limit or self.last_change + quiet <= self.clock.now:
+                return
+
+    def touch(self, name):
+        # Meta apo kathe event enos router: peak table kai programmatismos
+        # tou flush tou scheduler / FIB, opws tha ta ksypnouse to diko tous thread
+        router = self.routers[name]
+        self.peak_routes = max(self.peak_routes, len(router.routing_table))
+        deadline = router.scheduler.next_deadline()
+        if deadline is not None and deadline < self.armed.get(name, float('inf')):
+            self.armed[name] = deadline
+            self.at(max(deadline, self.clock.now), self.flush_updates, name)
+        if name not in self.fib_armed and router.fib.pending():
+            self.fib_armed.add(name)
+            self.at(self.clock.now + router.fib.flush_delay, self.flush_fib, name)
+
+    def flush_updates(self, name):
+        self.armed.pop(name, None)
+        if name in self.down:
+            return
+        router = self.routers[name]
+        if router.scheduler.poll(self.clock.now):
+            router.send_dv_updates(triggered=True)
+        self.touch(name)
+
+    def flush_fib(self, name):
+        self.fib_armed.discard(name)
+        if name not in self.down:
+            self.routers[name].fib.flush()
+
+    def timer(self, router, interval, fn):
+        # Oi timers enos router pou pese h ekane restart den ksanaprogrammatizontai
+        name = router.router_name
+        if name in self.down or self.routers[name] is not router:
+            return
+        fn()
+        self.touch(name)
+        self.at(self.clock.now + interval, self.timer, router, interval, fn)
+
+    def route_changed(self):
+        self.last_change = self.clock.now
+        self.at_last_change = (self.udp_messages, self.udp_bytes)
+
+    # --- topologia ---
+
+    def add_router(self, name, prefixes, ip=None, kernel=None):
+        if ip is None:
+            index = len(self.routers) + 1
+            ip = f"172.16.{index >> 8}.{index & 255}"
+        options = dict(self.router_options)
+        if self.restart_dir:
+            options['restart_file'] = os.path.join(self.restart_dir, name)
+        router = SimRouter(self, name, ip, prefixes, kernel=kernel, **options)
+        self.routers[name] = router
+        self.by_addr[(ip, UDP_PORT)] = name
+        # Oi timers twn routers den ksekinane sygxronismena
+        now = self.clock.now
+        self.at(now + self.rng.uniform(0, HELLO_INTERVAL), self.timer, router, HELLO_INTERVAL, router.send_hellos)
+        self.at(now + self.rng.uniform(0, UPDATE_INTERVAL), self.timer, router, UPDATE_INTERVAL,
+                lambda: router.send_dv_updates(triggered=False))
+        self.at(now + self.rng.uniform(0, EXPIRE_INTERVAL), self.timer, router, EXPIRE_INTERVAL,
+                lambda: router.expire(self.clock.now))
+        self.touch(name)
+        return router
+
+    def connect(self, a, b):
+        # Handshake opws sto handle_connection: antallagh ConnParamMessage
+        self.links[frozenset((a, b))] = True
+        ra, rb = self.routers[a], self.routers[b]
+        ab, ba = SimConn(self, a, b), SimConn(self, b, a)
+        self.conns[(a, b)], self.conns[(b, a)] = ab, ba
+        params_a = dv_pb2.ConnParamMessage()
+        params_a.ParseFromString(stream_reader(ra.conn_params())[1][0])
+        params_b = dv_pb2.ConnParamMessage()
+        params_b.ParseFromString(stream_reader(rb.conn_params())[1][0])
+        ra.add_neighbor(params_b, ab, rb.ip)
+        rb.add_neighbor(params_a, ba, ra.ip)
+        self.touch(a)
+        self.touch(b)
+
+    def link_up(self, a, b):
+        return (self.links.get(frozenset((a, b))) and a not in self.down and b not in self.down)
+
+    def fail_link(self, a, b, graceful=False):
+        # Siwphlh apotyxia: ta paketa xanontai kai oi geitones to katalavainoun
+        # apo to hello timeout. Me graceful kleinoun kai oi TCP syndeseis (FIN).
+        if graceful:
+            self.conns[(a, b)].close()
+            self.conns[(b, a)].close()
+        self.links[frozenset((a, b))] = False
+
+    def fail_node(self, name):
+        self.down.add(name)
+
+    def restart_node(self, name, downtime=1.0):
+        # To process tou router stamataei kai ksanaksekinaei meta apo downtime sec:
+        # oi TCP syndeseis tou kleinoun (FIN), to kernel tou (fake FIB) menei.
+        # An trexei graceful restart, o neos router fortwnei to snapshot tou.
+        old = self.routers[name]
+        old.shutdown()
+        peers = [b for (a, b), conn in self.conns.items() if a == name and not conn.closed]
+        for peer in peers:
+            self.conns[(name, peer)].close()
+        # Oso leipei den stelnei tipota kai ta paketa pros auton xanontai
+        self.down.add(name)
+        kernel = dict(old.fib.backend.routes)
+        self.at(self.clock.now + downtime, self.start_node, name, old.local_prefixes, old.ip, kernel, peers)
+
+    def start_node(self, name, prefixes, ip, kernel, peers):
+        self.down.discard(name)
+        self.add_router(name, prefixes, ip, kernel)
+        for peer in peers:
+            self.connect(name, peer)
+
+    # --- transport ---
+
+    def send_datagram(self, src, addr, data):
+        dst = self.by_addr.get(addr)
+        if dst is None or not self.link_up(src, dst):
+            self.dropped += 1
+            return
+        self.udp_messages += 1
+        self.udp_bytes += len(data)
+        self.at(self.clock.now + self.latency, self.deliver_datagram, dst, data)
+
+    def deliver_datagram(self, dst, data):
+        if dst in self.down:
+            return
+        self.routers[dst].handle_datagram(data)
+        self.touch(dst)
+
+    def send_stream(self, conn, data):
+        if not self.link_up(conn.src, conn.dst):
+            self.dropped += 1
+            return
+        self.tcp_frames += 1
+        self.tcp_bytes += len(data)
+        self.at(self.clock.now + self.latency, self.deliver_stream, conn, data)
+
+    def deliver_stream(self, conn, data):
+        if conn.closed or conn.dst in self.down:
+            return
+        router = self.routers[conn.dst]
+        for frame in conn.reader.feed(data):
+            router.handle_frame(conn.src, frame)
+        self.touch(conn.dst)
+
+    def close_stream(self, conn):
+        if self.link_up(conn.src, conn.dst):
+            self.at(self.clock.now + self.latency, self.peer_closed, conn)
+
+    def peer_closed(self, conn):
+        # O dst vlepei EOF sth syndesh tou pros ton src
+        router = self.routers[conn.dst]
+        reverse = self.conns.get((conn.dst, conn.src))
+        info = router.active_neighbors.get(conn.src)
+        if info is not None and info['tcp_conn'] is reverse:
+            router.remove_neighbor(conn.src, graceful=True)
+            self.touch(conn.dst)
+
+    # --- metrhseis ---
+
+    def distances(self, source):
+        # BFS panw sta energa links apo ton source
+        dist = {source: 0}
+        queue = deque([source])
+        adjacency = self.adjacency()
+        while queue:
+            node = queue.popleft()
+            for other in adjacency.get(node, ()):
+                if other not in dist:
+                    dist[other] = dist[node] + 1
+                    queue.append(other)
+        return dist
+
+    def adjacency(self):
+        adjacency = {}
+        for link, up in self.links.items():
+            a, b = tuple(link)
+            if up and a not in self.down and b not in self.down:
+                adjacency.setdefault(a, []).append(b)
+                adjacency.setdefault(b, []).append(a)
+        return adjacency
+
+    def verify(self):
+        # Sygkrish me ta shortest paths (hop count, max 15) ana (router, prefix):
+        # wrong = lathos reachability h metric mikrotero apo to shortest path,
+        # longer = reachable alla apo pio makry (px. epeidh to prefix ftanei mesa se summary)
+        wrong = longer = 0
+        for origin, router in self.routers.items():
+            if origin in self.down:
+                continue
+            dist = self.distances(origin)
+            for name, other in self.routers.items():
+                if name in self.down or name == origin:
+                    continue
+                hops = min(dist.get(name, INFINITY), INFINITY)
+                for prefix in router.local_prefixes:
+                    metric = self.forwarding_metric(other, prefix)
+                    if metric == hops:
+                        continue
+                    if hops < metric < INFINITY:
+                        longer += 1
+                    else:
+                        wrong += 1
+        return wrong, longer
+
+    def forwarding_metric(self, router, prefix):
+        # Longest-prefix-match opws sto kernel, pou exei mono ta zwntana routes
+        # (ta poisoned afairountai apo to FIB). To prefix mporei na ftanei mesa se summary.
+        addr = address_int(prefix.partition('/')[0])
+        for plen in router.routing_table.lengths:
+            entry = router.routing_table.routes.get((addr & MASKS[plen]) << 6 | plen)
+            if entry is not None and entry.metric < INFINITY:
+                return entry.metric
+        return INFINITY
+
+    def counters(self):
+        return (self.udp_messages, self.udp_bytes, self.tcp_frames, self.tcp_bytes)
+
+    def phase(self, event, quiet=None, limit=600.0):
+        # Trexei mexri th sygklish meta apo ena event pou molis egine
+        quiet = quiet if quiet is not None else NEIGHBOR_TIMEOUT + UPDATE_INTERVAL
+        start = self.clock.now
+        before = self.counters()
+        self.last_change = start
+        self.at_last_change = before[:2]
+        self.peak_routes = max(len(r.routing_table) for r in self.routers.values())
+        processed = self.processed
+        t0 = time.perf_counter()
+        self.run_until_quiet(quiet, start + limit)
+        wall = time.perf_counter() - t0
+        wrong, longer = self.verify()
+        result = {
+            'event': event,
+            'routers': len(self.routers) - len(self.down),
+            'converged_s': round(self.last_change - start, 3),
+            'messages': self.at_last_change[0] - before[0],
+            'bytes': self.at_last_change[1] - before[1],
+            'tcp_frames': self.tcp_frames - before[2],
+            'peak_routes': self.peak_routes,
+            'wrong_routes': wrong,
+            'longer_paths': longer,
+            'events': self.processed - processed,
+            'wall_s': round(wall, 3),
+        }
+        summarizers = [r.summarizer for r in self.routers.values() if r.summarizer and r.summarizer.runs]
+        if summarizers:
+            routes_out = sum(s.routes_out for s in summarizers)
+            result['compression'] = round(sum(s.routes_in for s in summarizers) / max(routes_out, 1), 2)
+        return result
+
+
+# --- topologies: lista apo (onomata, links, topika prefixes ana router) ---
+
+def local_prefixes(index, count):
+    # count synexomena /24 ana router (me count dynamh tou 2 einai kai aligned)
+    return [f"10.{n >> 8}.{n & 255}.0/24" for n in range(index * count, (index + 1) * count)]
+
+
+def ring(n, per_router=1):
+    names = [f"r{i}" for i in range(n)]
+    links = [(names[i], names[(i + 1) % n]) for i in range(n)]
+    return names, links, {name: local_prefixes(i, per_router) for i, name in enumerate(names)}
+
+
+def grid(width, height, per_router=1):
+    names = [f"r{x}_{y}" for y in range(height) for x in range(width)]
+    links = []
+    for y in range(height):
+        for x in range(width):
+            if x + 1 < width:
+                links.append((f"r{x}_{y}", f"r{x + 1}_{y}"))
+            if y + 1 < height:
+                links.append((f"r{x}_{y}", f"r{x}_{y + 1}"))
+    return names, links, {name: local_prefixes(i, per_router) for i, name in enumerate(names)}
+
+
+def random_graph(n, degree=3, seed=1, per_router=1):
+    # Syndedemenos: ena tyxaio spanning tree kai meta tyxaia links mexri to mesos vathmos
+    rnd = random.Random(seed)
+    names = [f"r{i}" for i in range(n)]
+    links = set()
+    for i in range(1, n):
+        links.add(frozenset((names[i], names[rnd.randrange(i)])))
+    while len(links) < min(n * degree // 2, n * (n - 1) // 2):
+        a, b = rnd.sample(names, 2)
+        links.add(frozenset((a, b)))
+    links = sorted(tuple(sorted(link)) for link in links)
+    return names, links, {name: local_prefixes(i, per_router) for i, name in enumerate(names)}
+
+
+def reference():
+    # H topologia twn 5 routers tou README
+    names = ['r1', 'r2', 'r3', 'r4', 'r5']
+    links = [('r1', 'r2'), ('r1', 'r3'), ('r2', 'r3'), ('r2', 'r5'), ('r3', 'r4'), ('r4', 'r5')]
+    prefixes = {'r1': ['10.10.10.0/24'], 'r2': [], 'r3': [], 'r4': ['30.30.30.0/24'], 'r5': ['20.20.20.0/24']}
+    return names, links, prefixes
+
+
+def build(topology, **options):
+    names, links, prefixes = topology
+    network = Network(**options)
+    for name in names:
+        network.add_router(name, prefixes[name])
+    for a, b in links:
+        network.connect(a, b)
+    return network, links
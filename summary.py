@@ -0,0 +1,99 @@
+from route_table import MASKS, prefix_key
+
+# Proairetiko summarization twn advertisements. Prin to UpdateCache, to
+# stigmiotypo tou table (kleidi -> (next_hop, metric)) ginetai to mikrotero
+# isodynamo syno:
+#  1. ena prefix pou kalyptetai apo to kontinotero tou ancestor me idio
+#     next_hop kai metric den xreiazetai (to LPM ston geitona dinei to idio)
+#  2. dyo adelfia prefixes (px. /25 + /25) me idio next_hop kai metric
+#     enwnontai sto parent (/24), an to parent den yparxei hdh me alla stoixeia.
+# Pote den enwnoume routes me diaforetiko next_hop. Etsi to poison reverse
+# ana geitona (olh h omada tou next_hop paei 16) isxyei kai gia ta summaries,
+# kai to longest-prefix-match kathe dieythynshs menei idio gia olous tous geitones.
+# Summaries ginontai mono mesa sta boundaries (px. 10.0.0.0/8) kai pote pio
+# konta apo to boundary.
+
+
+class Summarizer:
+    def __init__(self, boundaries, poison_metric):
+        self.poison_metric = poison_metric
+        # Ta boundaries ws kleidia tou route_table, to pio eidiko prwto
+        self.boundaries = sorted((prefix_key(b) for b in boundaries), key=lambda k: -(k & 63))
+        self.runs = 0
+        self.routes_in = 0    # routes prin to summarization (teleutaio run)
+        self.routes_out = 0   # routes pou diafhmizontai telika
+        # Ta zwntana summaries pou ftiaxthkan sto teleutaio run. Opws to discard
+        # route enos summary, o router agnoei adverts gia auta ta prefixes: alliws
+        # to diko tou summary epistrefei apo ena loop kai kyklofori san fantasma.
+        # Ena summary apo poisoned routes den mplokarei tipota.
+        self.summaries = frozenset()
+
+    def floor(self, key):
+        # To mhkos tou pio eidikou boundary pou periexei to prefix, h None
+        net, plen = key >> 6, key & 63
+        for boundary in self.boundaries:
+            blen = boundary & 63
+            if plen >= blen and net & MASKS[blen] == boundary >> 6:
+                return blen
+        return None
+
+    def ancestor(self, classes, lengths, key, floor):
+        # To kontinotero pio geniko prefix tou key pou yparxei sto table
+        net, plen = key >> 6, key & 63
+        for length in lengths:
+            if length >= plen:
+                continue
+            if length < floor:
+                break
+            parent = (net & MASKS[length]) << 6 | length
+            if parent in classes:
+                return parent
+        return None
+
+    def summarize(self, table):
+        # table: kleidi tou route_table -> (next_hop, metric)
+        classes = table
+        lengths = sorted({key & 63 for key in classes}, reverse=True)
+
+        out = {}
+        buckets = [[] for _ in range(33)]
+        for key, route in classes.items():
+            floor = self.floor(key)
+            if floor is not None:
+                parent = self.ancestor(classes, lengths, key, floor)
+                if parent is not None and classes[parent] == route:
+                    continue
+            out[key] = route
+            buckets[key & 63].append(key)
+
+        for plen in range(32, 0, -1):
+            bit = (1 << (32 - plen)) << 6
+            for key in buckets[plen]:
+                route = out.get(key)
+                if route is None:
+                    continue
+                sibling = key ^ bit
+                if out.get(sibling) != route:
+                    continue
+                parent = ((key >> 6) & MASKS[plen - 1]) << 6 | (plen - 1)
+                # An to parent yparxei hdh exei alla stoixeia (me ta idia tha eixe kalypsei ta paidia)
+                if parent in classes:
+                    continue
+                floor, sibling_floor = self.floor(key), self.floor(sibling)
+                if floor is None or sibling_floor is None or plen - 1 < max(floor, sibling_floor):
+                    continue
+                del out[key]
+                del out[sibling]
+                out[parent] = route
+                buckets[plen - 1].append(parent)
+
+        self.summaries = frozenset(key for key, (_, metric) in out.items()
+                                   if metric < self.poison_metric and key not in table)
+        self.runs += 1
+        self.routes_in = len(table)
+        self.routes_out = len(out)
+        return out
+
+    def ratio(self):
+        # Posa routes tou table antistoixoun se kathe route pou diafhmizetai
+        return self.routes_in / self.routes_out if self.routes_out else 1.0
@@ -0,0 +1,44 @@
+import heapq
+
+
+class ExpiryQueue:
+    # Heap me deadlines kai lazy deletion. Kathe kleidi exei to polu mia
+    # energh eggrafh sto heap. H ananewsh enos timestamp (hello, route refresh)
+    # den kostizei tipota: otan vgei h eggrafh apo to heap elegxoume to
+    # pragmatiko timestamp kai, an exei ananewthei, thn ksanavazoume.
+    # Etsi to kostos einai analogo me osa kleidia ftanoun sto deadline tous,
+    # oxi me to megethos tou table.
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.heap = []
+        self.scheduled = {}   # key -> deadline ths energhs eggrafhs
+
+    def __len__(self):
+        return len(self.scheduled)
+
+    def schedule(self, key, last_seen):
+        if key in self.scheduled:
+            return
+        deadline = last_seen + self.timeout
+        self.scheduled[key] = deadline
+        heapq.heappush(self.heap, (deadline, key))
+
+    def next_deadline(self):
+        return self.heap[0][0] if self.heap else None
+
+    def expired(self, now, last_seen_of):
+        # last_seen_of(key) -> trexon timestamp tou kleidiou, h None an den yparxei pia
+        out = []
+        while self.heap and self.heap[0][0] < now:
+            deadline, key = heapq.heappop(self.heap)
+            if self.scheduled.get(key) != deadline:
+                continue
+            del self.scheduled[key]
+            last_seen = last_seen_of(key)
+            if last_seen is None:
+                continue
+            if last_seen + self.timeout >= now:
+                self.schedule(key, last_seen)
+                continue
+            out.append(key)
+        return out
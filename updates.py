@@ -0,0 +1,180 @@
+import struct
+import threading
+
+import dv_pb2
+from route_table import MASKS, prefix_key, key_prefix
+
+# Field tags tou DVMessage (wire type 2 = length-delimited)
+HEADER_TAG = b'\x0a'   # field 1: header
+ROUTE_TAG = b'\x12'    # field 2: repeated Route (v1)
+ADDRS_TAG = b'\x1a'    # field 3: packed fixed32 addrs (v2)
+PLENS_TAG = b'\x22'    # field 4: packed plens (v2)
+METRICS_TAG = b'\x2a'  # field 5: packed metrics (v2)
+
+# v2: ana route 4 bytes dieythynsh, 1 byte plen kai 1 byte metric (varint < 128),
+# kai ana block ta 3 pedia me tag kai mhkos
+V2_ROUTE_SIZE = 6
+V2_BLOCK_OVERHEAD = 3 * (1 + 3)
+
+
+def encode_varint(value):
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def encode_field(tag, payload):
+    return tag + encode_varint(len(payload)) + payload
+
+
+def encode_header(header):
+    return encode_field(HEADER_TAG, header.SerializeToString())
+
+
+def encode_route(prefix, next_hop, metric):
+    return encode_field(ROUTE_TAG, dv_pb2.Route(prefix=prefix, next_hop=next_hop, metric=metric).SerializeToString())
+
+
+def encode_routes_v2(routes):
+    # routes: lista apo (kleidi tou route_table, metric). Ta packed pedia enos
+    # repeated field mporoun na epanalamvanontai: o parser ta synenwnei, opote
+    # kai ta v2 blocks kollane san bytes opws ta v1.
+    addrs = struct.pack(f'<{len(routes)}I', *[key >> 6 for key, _ in routes])
+    plens = bytes(key & 63 for key, _ in routes)
+    metrics = bytes(metric for _, metric in routes)
+    return encode_field(ADDRS_TAG, addrs) + encode_field(PLENS_TAG, plens) + encode_field(METRICS_TAG, metrics)
+
+
+def via(next_hop, neighbor):
+    # next_hop: onoma, h se ECMP tuple apo onomata. Split horizon ginetai pros ola.
+    return neighbor == next_hop or (type(next_hop) is tuple and neighbor in next_hop)
+
+
+def decode_routes(msg):
+    # Lista apo (kleidi tou route_table, metric) apo ena DVMessage, v1 h v2.
+    # To v2 den xreiazetai parsing keimenou.
+    if msg.addrs:
+        if not len(msg.addrs) == len(msg.plens) == len(msg.metrics):
+            raise ValueError("malformed v2 update")
+        return [((addr & MASKS[plen]) << 6 | plen, metric)
+                for addr, plen, metric in zip(msg.addrs, msg.plens, msg.metrics) if plen <= 32]
+    return [(prefix_key(r.prefix), r.metric) for r in msg.routes]
+
+
+class UpdateCache:
+    # Serialize-once: ta routes kwdikopoiountai mia fora ana version tou table.
+    # Ta routes omadopoiountai ana next_hop, kai h mono diafora metaksy geitonwn
+    # einai oti h omada pou mathame apo ton idio ton geitona paei poisoned (16).
+    # Ena DVMessage einai apla h synenwsh twn pediwn tou, opote ta blocks
+    # kollane san bytes xwris na ksanaftiaxnoume protobuf objects.
+    # Kathe wire version (1: Route messages, 2: packed pedia) kwdikopoieitai
+    # mono an to exei synomologhsei kapoios geitonas.
+    def __init__(self, budget, poison_metric):
+        self.budget = budget      # bytes gia routes se ena datagram
+        self.poison_metric = poison_metric
+        self.version = None
+        self.by_hop = {}          # next_hop -> [(kleidi, metric)]
+        self.groups = {}          # wire -> {next_hop -> (normal_blocks, poisoned_blocks)}
+        self.per_neighbor = {}    # (neighbor, wire) -> list of (bytes, route_count) ana datagram
+        self.lock = threading.Lock()
+        self.builds = 0
+
+    def _blocks(self, entries):
+        # Xwrizei ta encoded routes mias omadas se blocks pou xwrane se ena datagram
+        blocks = []
+        chunk = []
+        used = 0
+        for e in entries:
+            if chunk and used + len(e) > self.budget:
+                blocks.append((b''.join(chunk), len(chunk)))
+                chunk = []
+                used = 0
+            chunk.append(e)
+            used += len(e)
+        if chunk:
+            blocks.append((b''.join(chunk), len(chunk)))
+        return blocks
+
+    def _encode(self, wire, next_hop, routes):
+        # routes: (kleidi, metric) -> blocks pou xwrane se ena datagram
+        if wire >= 2:
+            step = (self.budget - V2_BLOCK_OVERHEAD) // V2_ROUTE_SIZE
+            return [(encode_routes_v2(routes[i:i + step]), len(routes[i:i + step]))
+                    for i in range(0, len(routes), step)]
+        if type(next_hop) is tuple:
+            next_hop = next_hop[0]
+        return self._blocks([encode_route(key_prefix(key), next_hop, metric) for key, metric in routes])
+
+    def update(self, version, table):
+        # table: kleidi tou route_table -> (next_hop, metric), ena stigmiotypo tou table.
+        # Se ECMP to next_hop einai tuple kai h omada einai to syno twn next hops.
+        with self.lock:
+            # Ena parallhlo send mporei na exei hdh xtisei neotero version
+            if self.version is not None and version <= self.version:
+                return
+            by_hop = {}
+            for key, (next_hop, metric) in table.items():
+                by_hop.setdefault(next_hop, []).append((key, metric))
+
+            self.by_hop = by_hop
+            self.groups = {}
+            self.per_neighbor = {}
+            self.version = version
+            self.builds += 1
+
+    def _groups(self, wire):
+        groups = self.groups.get(wire)
+        if groups is None:
+            groups = {}
+            for next_hop, routes in self.by_hop.items():
+                poisoned = None
+                if next_hop != '-':
+                    poisoned = self._encode(wire, next_hop, [(key, self.poison_metric) for key, _ in routes])
+                groups[next_hop] = (self._encode(wire, next_hop, routes), poisoned)
+            self.groups[wire] = groups
+        return groups
+
+    def needs_update(self, version):
+        return version != self.version
+
+    def datagrams(self, neighbor, wire=1):
+        # Lista apo (bytes, route_count), ena ana datagram, gia ton sygkekrimeno geitona
+        with self.lock:
+            cached = self.per_neighbor.get((neighbor, wire))
+            if cached is not None:
+                return cached
+
+            blocks = []
+            for next_hop, (normal, poisoned) in self._groups(wire).items():
+                # Split Horizon with Poison Reverse ana omada
+                blocks.extend(poisoned if via(next_hop, neighbor) else normal)
+
+            # Enwnoume mikra diadoxika blocks wste na gemizei kathe datagram
+            merged = []
+            for data, count in blocks:
+                if merged and len(merged[-1][0]) + len(data) <= self.budget:
+                    merged[-1] = (merged[-1][0] + data, merged[-1][1] + count)
+                else:
+                    merged.append((data, count))
+
+            self.per_neighbor[(neighbor, wire)] = merged
+            return merged
+
+    def delta_datagrams(self, neighbor, changes, wire=1):
+        # changes: lista apo (kleidi, next_hop, metric) pou allaksan meta to
+        # teleutaio advertisement pros ton geitona. Kostos O(allages).
+        if wire >= 2:
+            routes = [(key, self.poison_metric if via(next_hop, neighbor) else metric)
+                      for key, next_hop, metric in changes]
+            return self._encode(wire, None, routes)
+        entries = []
+        for key, next_hop, metric in changes:
+            if via(next_hop, neighbor):
+                metric = self.poison_metric
+            if type(next_hop) is tuple:
+                next_hop = next_hop[0]
+            entries.append(encode_route(key_prefix(key), next_hop, metric))
+        return self._blocks(entries)